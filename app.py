@@ -1,32 +1,68 @@
+import io
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory
+import time
+from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory, g, Response
 from markupsafe import Markup
 from werkzeug.utils import secure_filename
 from datetime import datetime
-from db import get_db, init_db
+from db import connect, get_db, init_db, insert_row, close_db
 from resume_processing import (
-    analyze_resume,
-    pdf_reader,
-    show_pdf_iframe,
+    parse_resume,
+    read_resume_text,
+    resume_ext,
+    show_resume_preview,
     detect_candidate_level,
     score_resume,
     recommend_field_and_skills,
 )
 from jd_matcher import jd_blueprint
+from export import export_blueprint
+from pyresparer.utils import ExtractionLimitExceeded
+from model_client import ModelServerError
+from db_writer import BufferFull
+import metrics
+import dedup
+import artifact_store
 
 
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET", "dev-secret-change-me")
 
 UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "Uploaded_Resumes")
+ALLOWED_RESUME_EXTS = {".pdf", ".docx", ".txt"}
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 app.register_blueprint(jd_blueprint, url_prefix="/jd_match")
+app.register_blueprint(export_blueprint, url_prefix="/admin/export")
+
+app.teardown_appcontext(close_db)
 
 # Ensure DB/tables exist at startup
 with app.app_context():
     init_db()
 
+# Load stored MinHash signatures off the request path
+dedup.pool.warm(connect)
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+    metrics.begin_request()
+
+
+@app.after_request
+def _record_timings(response):
+    timings = metrics.end_request()
+    start = g.pop("request_start", None)
+    if start is not None and request.endpoint != "metrics_page":
+        total = time.perf_counter() - start
+        metrics.observe(f"request_{request.endpoint}", total)
+        timings.append(("total", total))
+    if metrics.TIMING_HEADER and timings:
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings)
+    return response
+
+
 @app.route("/")
 def home():
     return render_template("index.html")
@@ -39,28 +75,65 @@ def analyze():
 
     f = request.files.get("resume")
     if not f or f.filename == "":
-        flash("Please upload a PDF resume.")
+        flash("Please upload a PDF, DOCX or TXT resume.")
         return redirect(url_for("home"))
 
     filename = secure_filename(f.filename)
+    ext = resume_ext(filename)
+    if ext not in ALLOWED_RESUME_EXTS:
+        flash("Please upload a PDF, DOCX or TXT resume.")
+        return redirect(url_for("home"))
+
+    metrics.inc("ats_uploads_total", endpoint="analyze")
+    # Read the upload once; parsing and preview work from memory, the
+    # saved copy is only kept for /uploads.
+    data = f.read()
     save_path = os.path.join(UPLOAD_FOLDER, filename)
-    f.save(save_path)
+    with metrics.timed("save_upload"):
+        with open(save_path, "wb") as out:
+            out.write(data)
+
+    def _buffer():
+        buf = io.BytesIO(data)
+        buf.name = filename
+        return buf
 
     # Extract
-    extracted = analyze_resume(save_path)
+    try:
+        with metrics.timed("parse"):
+            extracted, parsed_doc = parse_resume(_buffer())
+    except ModelServerError:
+        app.logger.warning("model server busy; rejected /analyze", exc_info=True)
+        flash("We're busy analysing other resumes right now. Please try again in a minute.")
+        return redirect(url_for("home"))
     if not extracted:
+        metrics.inc("ats_parse_failures_total")
+        flash("Sorry, we could not parse your resume.")
+        return redirect(url_for("home"))
+
+    try:
+        with metrics.timed("read_text"):
+            resume_text = read_resume_text(_buffer(), ext)
+    except ExtractionLimitExceeded:
+        metrics.inc("ats_parse_failures_total")
         flash("Sorry, we could not parse your resume.")
         return redirect(url_for("home"))
 
-    resume_text = pdf_reader(save_path)
+    with metrics.timed("score"):
+        cand_level, level_msg = detect_candidate_level(extracted, resume_text)
 
-    cand_level, level_msg = detect_candidate_level(extracted, resume_text)
+        reco = recommend_field_and_skills(extracted)
 
-    reco = recommend_field_and_skills(extracted)
+        score, tips, progress = score_resume(resume_text)
 
-    score, tips, progress = score_resume(resume_text)
+    with metrics.timed("minhash"):
+        signature = dedup.minhash(resume_text)
+        dup_of = dedup.pool.find_duplicate(get_db(), signature)
+    if dup_of:
+        metrics.inc("ats_near_duplicates_total")
 
-    pdf_iframe = Markup(show_pdf_iframe(save_path))
+    with metrics.timed("preview"):
+        pdf_iframe = Markup(show_resume_preview(data, ext, resume_text))
 
     now = datetime.now()
     timestamp = now.strftime("%Y-%m-%d_%H:%M:%S")
@@ -72,45 +145,58 @@ def analyze():
     dev_user = os.getenv('USER') or os.getenv('USERNAME') or 'server'
     os_name_ver = f"{os.name}"
 
-    db = get_db()
-    cur = db.cursor()
-
     insert_sql = (
         "INSERT INTO user_data (sec_token, ip_add, host_name, dev_user, os_name_ver, latlong, city, state, country, "
         "act_name, act_mail, act_mob, Name, Email_ID, resume_score, Timestamp, Page_no, Predicted_Field, User_level, "
-        "Actual_skills, Recommended_skills, Recommended_courses, pdf_name) "
-        "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"
+        "Actual_skills, Recommended_skills, Recommended_courses, pdf_name, minhash, dup_of) "
+        "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"
     )
 
-    cur.execute(
-        insert_sql,
-        (
-            sec_token,
-            ip_add,
-            host_name,
-            dev_user,
-            os_name_ver,
-            None,  # latlong best-effort omitted
-            None,  # city
-            None,  # state
-            None,  # country
-            name,
-            email,
-            phone,
-            extracted.get("name"),
-            extracted.get("email"),
-            str(score),
-            timestamp,
-            str(extracted.get("no_of_pages")),
-            reco.get("field"),
-            cand_level,
-            str(extracted.get("skills")),
-            str(reco.get("skills", [])),
-            str(reco.get("courses")),
-            filename,
-        ),
-    )
-    db.commit()
+    try:
+        with metrics.timed("db_insert"):
+            insert_row(
+                insert_sql,
+                (
+                    sec_token,
+                    ip_add,
+                    host_name,
+                    dev_user,
+                    os_name_ver,
+                    None,  # latlong best-effort omitted
+                    None,  # city
+                    None,  # state
+                    None,  # country
+                    name,
+                    email,
+                    phone,
+                    extracted.get("name"),
+                    extracted.get("email"),
+                    str(score),
+                    timestamp,
+                    str(extracted.get("no_of_pages")),
+                    reco.get("field"),
+                    cand_level,
+                    str(extracted.get("skills")),
+                    str(reco.get("skills", [])),
+                    str(reco.get("courses")),
+                    filename,
+                    dedup.pack(signature) if signature is not None else None,
+                    dup_of,
+                ),
+            )
+    except BufferFull:
+        app.logger.warning("write-behind buffer full; rejected /analyze")
+        flash("We're saving a lot of resumes right now. Please try again in a minute.")
+        return redirect(url_for("home"))
+    dedup.pool.add(sec_token, signature)
+
+    # Keep the parse so rescore.py can rerun scoring without the PDF or model
+    if artifact_store.enabled():
+        try:
+            with metrics.timed("artifact_save"):
+                artifact_store.save(sec_token, parsed_doc, resume_text, extracted)
+        except Exception:
+            app.logger.exception("could not store parsed resume %s", sec_token)
 
     return render_template(
         "results.html",
@@ -142,13 +228,16 @@ def submit_feedback():
     comments = request.form.get("comments")
     ts = datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
 
-    db = get_db()
-    cur = db.cursor()
-    cur.execute(
-        "INSERT INTO user_feedback (feed_name, feed_email, feed_score, comments, Timestamp) VALUES (%s,%s,%s,%s,%s)",
-        (name, email, str(feed_score), comments, ts),
-    )
-    db.commit()
+    try:
+        with metrics.timed("db_insert_feedback"):
+            insert_row(
+                "INSERT INTO user_feedback (feed_name, feed_email, feed_score, comments, Timestamp) VALUES (%s,%s,%s,%s,%s)",
+                (name, email, str(feed_score), comments, ts),
+            )
+    except BufferFull:
+        app.logger.warning("write-behind buffer full; rejected /feedback")
+        flash("We couldn't record your feedback right now. Please try again in a minute.")
+        return redirect(url_for("feedback_page"))
     flash("Thanks! Your feedback was recorded.")
     return redirect(url_for("feedback_page"))
 
@@ -158,6 +247,11 @@ def about():
     return render_template("about.html")
 
 
+@app.get("/metrics")
+def metrics_page():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.get("/admin")
 def admin_login():
     return render_template("admin_login.html")
@@ -181,7 +275,7 @@ def admin_dash():
     cur.execute("SELECT COUNT(*) FROM user_data")
     total_users = cur.fetchone()[0]
 
-    cur.execute("SELECT ID, sec_token, ip_add, act_name, act_mail, act_mob, Predicted_Field, Timestamp, Name, Email_ID, resume_score, Page_no, pdf_name, User_level, Actual_skills, Recommended_skills, Recommended_courses, city, state, country, latlong, os_name_ver, host_name, dev_user FROM user_data")
+    cur.execute("SELECT ID, sec_token, ip_add, act_name, act_mail, act_mob, Predicted_Field, Timestamp, Name, Email_ID, resume_score, Page_no, pdf_name, User_level, Actual_skills, Recommended_skills, Recommended_courses, city, state, country, latlong, os_name_ver, host_name, dev_user, dup_of FROM user_data")
     users = cur.fetchall()
 
     cur.execute("SELECT * FROM user_feedback")
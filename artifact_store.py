@@ -0,0 +1,63 @@
+import os
+from spacy.tokens import Doc, DocBin
+
+# Parsed resumes on disk, one DocBin file per user_data row (keyed by
+# sec_token), so rescore.py can re-run skills/scoring/recommendations
+# without touching the PDF or the transformer again. DocBin files are
+# zlib-compressed; the scoring text and parse metadata ride along in
+# doc.user_data under _META_KEY, which is the only user_data key stored.
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "Parsed_Resumes")
+
+_META_KEY = "ats_artifact"
+_SUFFIX = ".spacy"
+
+
+def enabled():
+    return bool(ARTIFACT_DIR)
+
+
+def _path(key):
+    return os.path.join(ARTIFACT_DIR, f"{key}{_SUFFIX}")
+
+
+def save(key, doc, resume_text, extracted):
+    """
+    Persist the parser's Doc plus the full resume text and the extracted
+    fields that scoring reads.
+    """
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    # Store annotations only: the pipeline's user_data holds extension
+    # values such as doc._.trf_data (transformer activations), which would
+    # bloat the file or fail to serialize
+    stored = Doc(doc.vocab).from_bytes(doc.to_bytes(exclude=["user_data", "tensor"]))
+    stored.user_data[_META_KEY] = {
+        "resume_text": resume_text,
+        "name": extracted.get("name"),
+        "email": extracted.get("email"),
+        "mobile_number": extracted.get("mobile_number"),
+        "no_of_pages": extracted.get("no_of_pages"),
+    }
+    data = DocBin(docs=[stored], store_user_data=True).to_bytes()
+    path = _path(key)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load(key, vocab):
+    """
+    Return (doc, meta) for a stored resume.
+    """
+    with open(_path(key), "rb") as f:
+        doc = next(DocBin(store_user_data=True).from_bytes(f.read()).get_docs(vocab))
+    return doc, doc.user_data.get(_META_KEY, {})
+
+
+def iter_keys():
+    if not os.path.isdir(ARTIFACT_DIR):
+        return
+    for entry in os.scandir(ARTIFACT_DIR):
+        if entry.is_file() and entry.name.endswith(_SUFFIX):
+            yield entry.name[:-len(_SUFFIX)]
@@ -0,0 +1,88 @@
+"""
+MinHash/LSH near-duplicate lookup over a synthetic resume pool.
+
+Usage: python benchmarks/bench_dedup.py [pool_size] [planted_pairs]
+
+The bulk of the pool is random signatures (unrelated resumes have
+near-independent MinHash values); `planted_pairs` real resume-like texts
+and lightly edited copies are computed with dedup.minhash() and mixed in to
+measure recall. LSH lookups are compared against a brute-force scan.
+"""
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import dedup  # noqa: E402
+
+VOCAB = [f"term{i}" for i in range(5000)] + [
+    "python", "java", "sql", "react", "flask", "django", "experience", "education",
+    "projects", "internship", "skills", "achievements", "certification",
+]
+
+
+def fake_resume(rng, words=600):
+    return " ".join(rng.choice(VOCAB) for _ in range(words))
+
+
+def edit(rng, text, changes=10):
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(VOCAB)
+    return " ".join(words)
+
+
+def main():
+    pool_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    planted = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(42)
+
+    print(f"pool={pool_size} planted_pairs={planted} perms={dedup.NUM_PERM} bands={dedup.BANDS}x{dedup.ROWS}")
+
+    t = time.perf_counter()
+    originals, edited = [], []
+    for _ in range(planted):
+        text = fake_resume(rng)
+        originals.append(dedup.minhash(text))
+        edited.append(dedup.minhash(edit(rng, text)))
+    per_sig = (time.perf_counter() - t) / (2 * planted)
+    print(f"minhash: {per_sig * 1000:.2f} ms/resume")
+
+    bulk = [tuple(rng.getrandbits(32) for _ in range(dedup.NUM_PERM)) for _ in range(pool_size - planted)]
+
+    tracemalloc.start()
+    index = dedup.LSHIndex()
+    t = time.perf_counter()
+    for i, sig in enumerate(bulk):
+        index.insert(f"r{i}", sig)
+    for i, sig in enumerate(originals):
+        index.insert(f"orig{i}", sig)
+    build = time.perf_counter() - t
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"index build: {build:.1f} s ({build / pool_size * 1e6:.1f} us/insert), peak mem {peak / 2**20:.0f} MiB")
+
+    t = time.perf_counter()
+    hits = 0
+    for i, sig in enumerate(edited):
+        matches = index.query(sig)
+        if matches and matches[0][0] == f"orig{i}":
+            hits += 1
+    lsh_query = (time.perf_counter() - t) / planted
+    print(f"lsh query: {lsh_query * 1000:.3f} ms, recall {hits}/{planted}")
+
+    # Brute force over a few queries only; it is O(pool) per lookup
+    sigs = [dedup.unpack(s) for s in index._sigs]
+    samples = edited[:5]
+    t = time.perf_counter()
+    for sig in samples:
+        max(dedup.similarity(sig, other) for other in sigs)
+    brute = (time.perf_counter() - t) / len(samples)
+    print(f"brute-force query: {brute * 1000:.1f} ms ({brute / lsh_query:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
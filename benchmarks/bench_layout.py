@@ -0,0 +1,159 @@
+"""
+Layout-based header extraction vs the en_core_web_trf NER path.
+
+Usage: python benchmarks/bench_layout.py <dir with PDF resumes> [--labels labels.csv] [--no-ner]
+
+With --labels (a CSV with file,name,email,mobile_number columns, e.g. from
+make_layout_corpus.py or hand-labelled real resumes), reports how often the
+layout name is correct at each confidence threshold: "coverage" is the share
+of resumes that would skip NER, "precision" the share of those whose name is
+right. LAYOUT_MIN_CONFIDENCE should sit where precision stays ~100%.
+
+Calibrate on real, hand-labelled resumes. make_layout_corpus.py only renders
+the header styles the extractor's rules were written against, so its numbers
+are circular and are not grounds for turning on LAYOUT_SKIP_NER.
+
+Unless --no-ner is given (or en_core_web_trf isn't installed), every PDF is
+also parsed once with use_layout=False (NER name) and once layout-first, and
+the script reports name/email/phone agreement and the median parse time of
+each path. The transformer is loaded before timing starts so model load is
+not counted.
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+import statistics
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pyresparer import layout  # noqa: E402
+from pyresparer.resume_parser import ResumeParser, load_nlp_model  # noqa: E402
+
+THRESHOLDS = [0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95]
+
+
+def _norm(value):
+    return " ".join(str(value or "").lower().split())
+
+
+def _digits(value):
+    return "".join(ch for ch in str(value or "") if ch.isdigit())[-10:]
+
+
+def _load_labels(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["file"]: row for row in csv.DictReader(f)}
+
+
+def calibrate(pdfs, labels):
+    """
+    Layout-only pass scored against ground truth.
+    """
+    results = []
+    for path in pdfs:
+        label = labels.get(os.path.basename(path))
+        if label is None:
+            continue
+        fields = layout.extract_header_fields(path) or {"name": None, "email": None,
+                                                        "mobile_number": None, "confidence": 0.0}
+        results.append({
+            "style": label.get("style") or "-",
+            "confidence": fields["confidence"] if fields["name"] else 0.0,
+            "name": _norm(fields["name"]) == _norm(label["name"]),
+            "email": _norm(fields["email"]) == _norm(label["email"]),
+            "mobile_number": _digits(fields["mobile_number"]) == _digits(label["mobile_number"]),
+        })
+
+    n = len(results)
+    if not n:
+        print("no labelled PDFs found")
+        return
+    print(f"labelled resumes: {n}")
+    for field in ("name", "email", "mobile_number"):
+        hits = sum(r[field] for r in results)
+        print(f"layout {field} correct: {hits}/{n} ({hits / n:.1%})")
+
+    by_style = defaultdict(list)
+    for r in results:
+        by_style[r["style"]].append(r)
+    if len(by_style) > 1:
+        print()
+        print(f"{'style':<16}{'n':>4}{'name ok':>9}{'conf min':>10}{'conf max':>10}")
+        for style, rows in sorted(by_style.items()):
+            confs = [r["confidence"] for r in rows]
+            print(f"{style:<16}{len(rows):>4}{sum(r['name'] for r in rows):>9}{min(confs):>10.2f}{max(confs):>10.2f}")
+
+    print()
+    print(f"{'threshold':>9}{'coverage':>14}{'precision':>18}")
+    for t in THRESHOLDS:
+        confident = [r for r in results if r["confidence"] >= t]
+        right = sum(r["name"] for r in confident)
+        precision = f"{right}/{len(confident)} ({right / len(confident):.1%})" if confident else "-"
+        marker = "  <- LAYOUT_MIN_CONFIDENCE" if abs(t - layout.LAYOUT_MIN_CONFIDENCE) < 1e-9 else ""
+        print(f"{t:>9.2f}{len(confident):>6} ({len(confident) / n:>5.1%}){precision:>18}{marker}")
+
+
+def compare_with_ner(pdfs):
+    ner_times, layout_times = [], []
+    confident = 0
+    agree = {"name": 0, "email": 0, "mobile_number": 0}
+
+    for path in pdfs:
+        t = time.perf_counter()
+        ner = ResumeParser(path, use_layout=False).get_extracted_data()
+        ner_times.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        parser = ResumeParser(path, use_layout=True)
+        fast = parser.get_extracted_data()
+        layout_times.append(time.perf_counter() - t)
+
+        confident += parser.layout_confident
+        for field in agree:
+            agree[field] += _norm(ner[field]) == _norm(fast[field])
+
+        flag = "layout" if parser.layout_confident else "ner"
+        conf = parser.layout["confidence"] if parser.layout else 0.0
+        print(f"{os.path.basename(path)}: [{flag} {conf:.2f}] ner={ner['name']!r} layout={fast['name']!r}")
+
+    n = len(pdfs)
+    print()
+    print(f"resumes: {n}, layout confident: {confident}/{n} (threshold {layout.LAYOUT_MIN_CONFIDENCE})")
+    for field, hits in agree.items():
+        print(f"agreement {field}: {hits}/{n} ({hits / n:.0%})")
+    ner_med = statistics.median(ner_times)
+    fast_med = statistics.median(layout_times)
+    print(f"median parse: ner {ner_med * 1000:.0f} ms, layout-first {fast_med * 1000:.0f} ms "
+          f"({ner_med / fast_med:.1f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder")
+    parser.add_argument("--labels", help="ground-truth CSV (file,name,email,mobile_number[,style])")
+    parser.add_argument("--no-ner", action="store_true", help="skip the en_core_web_trf comparison")
+    args = parser.parse_args(argv)
+
+    pdfs = sorted(os.path.join(args.folder, f) for f in os.listdir(args.folder) if f.lower().endswith(".pdf"))
+    if not pdfs:
+        sys.exit(f"no PDFs in {args.folder}")
+
+    if args.labels:
+        calibrate(pdfs, _load_labels(args.labels))
+
+    if args.no_ner:
+        return
+    try:
+        load_nlp_model()
+    except RuntimeError as exc:
+        print(f"\nskipping NER comparison: {exc}")
+        return
+    print()
+    compare_with_ner(pdfs)
+
+
+if __name__ == "__main__":
+    main()
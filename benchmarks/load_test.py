@@ -0,0 +1,158 @@
+"""
+Latency under concurrency for /analyze, /feedback and /admin/dashboard.
+
+Start the app against the backend you want to measure, e.g.
+
+    DB_BACKEND=sqlite gunicorn -w 4 app:app -b 127.0.0.1:8000
+    DB_BACKEND=mysql  gunicorn -w 4 app:app -b 127.0.0.1:8000
+
+then run
+
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --label sqlite \\
+        --concurrency 1,4,16,32 --requests 200
+
+Each endpoint is driven at each concurrency level in turn and the script
+prints p50/p99 latency, throughput and error count per cell. Only the
+status an endpoint returns on success counts as success: /analyze renders
+its results page (200) and redirects only on failure, /feedback redirects
+(302) on success.
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_RESUME = os.path.join(os.path.dirname(__file__), "..", "Uploaded_Resumes", "surya_resume.pdf")
+
+
+EXPECTED_STATUS = {"/analyze": 200, "/feedback": 302, "/admin/dashboard": 200}
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Time the POST itself, not the page a redirect points to, and keep the
+    # 3xx visible so a redirecting failure isn't mistaken for success
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, data, ctype) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {ctype}\r\n\r\n".encode() + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def build_requests(base_url, resume_path):
+    with open(resume_path, "rb") as f:
+        resume = f.read()
+    resume_name = os.path.basename(resume_path)
+
+    def analyze():
+        body, ctype = _multipart(
+            {"name": "Load Test", "email": "load@test.local", "phone": "9999999999"},
+            {"resume": (resume_name, resume, "application/pdf")},
+        )
+        return urllib.request.Request(f"{base_url}/analyze", data=body, headers={"Content-Type": ctype})
+
+    def feedback():
+        body = urllib.parse.urlencode(
+            {"name": "Load Test", "email": "load@test.local", "score": "5", "comments": "load test"}
+        ).encode()
+        return urllib.request.Request(f"{base_url}/feedback", data=body)
+
+    def dashboard():
+        return urllib.request.Request(f"{base_url}/admin/dashboard")
+
+    return {"/analyze": analyze, "/feedback": feedback, "/admin/dashboard": dashboard}
+
+
+def _one(make_request, expected, timeout):
+    start = time.perf_counter()
+    try:
+        with _opener.open(make_request(), timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return time.perf_counter() - start, status == expected
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return float("nan")
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def run_level(make_request, expected, concurrency, total, timeout):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def task(_):
+        nonlocal errors
+        elapsed, ok = _one(make_request, expected, timeout)
+        with lock:
+            # Percentiles cover successful requests only
+            if ok:
+                latencies.append(elapsed)
+            errors += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(task, range(total)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return percentile(latencies, 50), percentile(latencies, 99), total / wall, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--label", default="", help="tag for the output, e.g. the backend name")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint per level")
+    parser.add_argument("--endpoints", default="/analyze,/feedback,/admin/dashboard")
+    parser.add_argument("--resume", default=DEFAULT_RESUME, help="file uploaded to /analyze")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    requests_by_endpoint = build_requests(args.url.rstrip("/"), args.resume)
+    endpoints = [e for e in args.endpoints.split(",") if e]
+    unknown = [e for e in endpoints if e not in requests_by_endpoint]
+    if unknown:
+        sys.exit(f"unknown endpoints: {', '.join(unknown)}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    label = f"[{args.label}] " if args.label else ""
+    print(f"{label}{args.url}, {args.requests} requests per cell")
+    print(f"{'endpoint':<18}{'conc':>6}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}")
+    for endpoint in endpoints:
+        for level in levels:
+            p50, p99, rps, errors = run_level(
+                requests_by_endpoint[endpoint], EXPECTED_STATUS[endpoint], level, args.requests, args.timeout
+            )
+            print(f"{endpoint:<18}{level:>6}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}{rps:>10.1f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Labelled synthetic resumes for calibrating the layout header extractor.
+
+Usage: python benchmarks/make_layout_corpus.py <out dir> [count] [seed]
+
+Writes <count> one-page PDFs plus labels.csv (file, name, email,
+mobile_number, style). Each PDF uses one of the header styles below,
+including the ones that trip up a "largest text at the top" rule (a job
+title, section heading or name-shaped tagline set larger than the name,
+contact details above the name, a name no bigger than body text, a name
+split over two lines), and a quarter of the email addresses don't contain
+the name, so bench_layout.py --labels can measure how often a confident
+layout name is actually right.
+
+This is a smoke test for the extractor, not a calibration set: the styles
+here and the rules in pyresparer/layout.py were written together, so a high
+precision on this corpus doesn't carry over to real resumes.
+"""
+import os
+import csv
+import sys
+import random
+
+import fitz  # PyMuPDF
+
+FIRST = ["Aarav", "Priya", "Rahul", "Sneha", "Mohammed", "Fatima", "John", "Emily", "Carlos", "Lucia",
+         "Wei", "Mei", "Olusegun", "Chiamaka", "Dmitri", "Anastasia", "Kwame", "Ama", "Liam", "Sofia",
+         "Arjun", "Divya", "Hiroshi", "Yuki", "Mateo", "Isabella", "Omar", "Layla", "Noah", "Zara"]
+LAST = ["Sharma", "Iyer", "Patel", "Reddy", "Khan", "Fernandes", "Smith", "O'Brien", "Garcia", "Rossi",
+        "Zhang", "Chen", "Adeyemi", "Okafor", "Ivanov", "Petrova", "Mensah", "Boateng", "Murphy", "Lopez",
+        "Nair", "Menon", "Tanaka", "Sato", "Silva", "Martinez", "Haddad", "Saleh", "Smith-Jones", "Ali"]
+MIDDLE = ["A.", "K.", "Maria", "R.", "van", "de"]
+TITLES = ["Software Engineer", "Senior Data Scientist", "Full Stack Developer", "Product Designer",
+          "Machine Learning Engineer", "Android Developer", "Business Analyst"]
+HEADINGS = ["Professional Summary", "Career Objective", "Work Experience", "Technical Skills"]
+# Two-word taglines that look like names to the regex and aren't role words
+TAGLINES = ["Creative Thinker", "Passionate Coder", "Aspiring Technologist", "Curious Builder",
+            "Problem Solver", "Lifelong Learner"]
+HANDLES = ["techie", "coder", "dev", "hello", "jobs", "career", "ninja", "pixel"]
+BODY = [
+    "Built and maintained REST APIs in Python and Flask serving two million requests per day.",
+    "Led migration of a monolith to containerised services on Kubernetes with zero downtime.",
+    "Designed dashboards in React and TypeScript used by three hundred internal analysts.",
+    "Trained gradient boosted models for churn prediction and improved recall by twelve points.",
+    "Mentored four junior engineers and introduced code review guidelines across the team.",
+    "Automated nightly data pipelines with Airflow, cutting manual reporting time in half.",
+    "Bachelor of Technology in Computer Science, graduated with first class honours.",
+    "Skills: Python, SQL, Docker, AWS, Git, Linux, Pandas, scikit-learn, JavaScript.",
+]
+
+STYLES = [
+    "classic",          # large name first, contact line below
+    "left_contact",     # name left, contact block in a right-hand column
+    "caps",             # NAME IN CAPITALS
+    "titled",           # "RESUME" / "Curriculum Vitae" banner above the name
+    "job_title_big",    # job title set larger than the name
+    "heading_first",    # section heading above a body-size name
+    "contact_first",    # email/phone line above the name
+    "body_size_name",   # bold name at body size
+    "middle_name",      # three- or four-word names
+    "split_name",       # first name and surname on separate lines
+    "tagline_big",      # a name-shaped tagline set larger than the name
+]
+
+
+def _person(rng, style):
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    if style == "middle_name":
+        parts = [first, rng.choice(MIDDLE), last]
+        if rng.random() < 0.4:
+            parts.insert(2, rng.choice(MIDDLE))
+        name = " ".join(parts)
+    else:
+        name = f"{first} {last}"
+    if rng.random() < 0.25:
+        # Plenty of addresses say nothing about the owner's name
+        handle = f"{rng.choice(HANDLES)}.{rng.choice(HANDLES)}"
+    else:
+        handle = "".join(ch for ch in (first + "." + last).lower() if ch.isalnum() or ch == ".")
+    email = f"{handle}{rng.randint(1, 99)}@{rng.choice(['gmail.com', 'outlook.com', 'example.org'])}"
+    phone = f"+91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}"
+    return name, email, phone
+
+
+def _body(page, rng, y, size=10.5):
+    while y < page.rect.height - 60:
+        if rng.random() < 0.2:
+            page.insert_text((50, y), rng.choice(HEADINGS).upper(), fontsize=size + 1.5, fontname="hebo")
+            y += size * 2
+        page.insert_text((50, y), rng.choice(BODY), fontsize=size, fontname="helv")
+        y += size * 1.6
+
+
+def render(path, rng, style):
+    name, email, phone = _person(rng, style)
+    shown = name.upper() if style == "caps" else name
+    contact = f"{email}  |  {phone}  |  Bengaluru, India"
+    big = rng.choice([18, 20, 22, 24])
+
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    y = 60
+    if style in ("classic", "caps", "middle_name"):
+        page.insert_text((50, y), shown, fontsize=big, fontname="hebo")
+        page.insert_text((50, y + 24), contact, fontsize=10, fontname="helv")
+        y += 60
+    elif style == "left_contact":
+        page.insert_text((50, y + 8), shown, fontsize=big, fontname="hebo")
+        page.insert_text((380, y - 4), email, fontsize=9.5, fontname="helv")
+        page.insert_text((380, y + 10), phone, fontsize=9.5, fontname="helv")
+        page.insert_text((380, y + 24), "Pune, India", fontsize=9.5, fontname="helv")
+        y += 60
+    elif style == "titled":
+        page.insert_text((230, y), rng.choice(["RESUME", "Curriculum Vitae"]), fontsize=big + 2, fontname="hebo")
+        page.insert_text((50, y + 36), shown, fontsize=big - 4, fontname="hebo")
+        page.insert_text((50, y + 56), contact, fontsize=10, fontname="helv")
+        y += 90
+    elif style == "job_title_big":
+        page.insert_text((50, y), rng.choice(TITLES), fontsize=big, fontname="hebo")
+        page.insert_text((50, y + 26), shown, fontsize=13, fontname="hebo")
+        page.insert_text((50, y + 44), contact, fontsize=10, fontname="helv")
+        y += 80
+    elif style == "tagline_big":
+        page.insert_text((50, y), rng.choice(TAGLINES), fontsize=big, fontname="hebo")
+        page.insert_text((50, y + 26), shown, fontsize=14, fontname="hebo")
+        page.insert_text((50, y + 44), contact, fontsize=10, fontname="helv")
+        y += 80
+    elif style == "heading_first":
+        page.insert_text((50, y), rng.choice(HEADINGS), fontsize=16, fontname="hebo")
+        page.insert_text((50, y + 24), shown, fontsize=11, fontname="hebo")
+        page.insert_text((50, y + 40), contact, fontsize=10, fontname="helv")
+        y += 70
+    elif style == "contact_first":
+        page.insert_text((50, y), contact, fontsize=10, fontname="helv")
+        page.insert_text((50, y + 30), shown, fontsize=big, fontname="hebo")
+        y += 70
+    elif style == "body_size_name":
+        page.insert_text((50, y), shown, fontsize=10.5, fontname="hebo")
+        page.insert_text((50, y + 16), contact, fontsize=10, fontname="helv")
+        y += 50
+    elif style == "split_name":
+        first, _, last = name.partition(" ")
+        page.insert_text((50, y), first, fontsize=big, fontname="hebo")
+        page.insert_text((50, y + big + 4), last, fontsize=big, fontname="hebo")
+        page.insert_text((50, y + 2 * big + 20), contact, fontsize=10, fontname="helv")
+        y += 2 * big + 50
+    _body(page, rng, y)
+    doc.save(path)
+    doc.close()
+    return name, email, phone
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    out = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    rng = random.Random(int(sys.argv[3]) if len(sys.argv) > 3 else 7)
+    os.makedirs(out, exist_ok=True)
+
+    with open(os.path.join(out, "labels.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "name", "email", "mobile_number", "style"])
+        for i in range(count):
+            style = STYLES[i % len(STYLES)]
+            fname = f"resume_{i:04d}.pdf"
+            name, email, phone = render(os.path.join(out, fname), rng, style)
+            writer.writerow([fname, name, email, phone, style])
+    print(f"wrote {count} resumes to {out}")
+
+
+if __name__ == "__main__":
+    main()
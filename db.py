@@ -1,31 +1,99 @@
 import os
 import pymysql
+import pymysql.cursors
 from flask import current_app, g
+import db_sqlite
+
+# "mysql" (default) or "sqlite" for single-node / benchmark deployments
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "ats.sqlite3")
 
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_USER = os.getenv("DB_USER", "root")
 DB_PASS = os.getenv("DB_PASS", "root")
 DB_NAME = os.getenv("DB_NAME", "MINI_ATS")
 
+WRITE_BEHIND = os.getenv("DB_WRITE_BEHIND", "0") == "1"
+
+
+def connect():
+    if DB_BACKEND == "sqlite":
+        return db_sqlite.connect(SQLITE_PATH)
+    return pymysql.connect(host=DB_HOST, user=DB_USER, password=DB_PASS, db=DB_NAME, autocommit=False)
+
+
+def stream_cursor(conn):
+    """
+    Unbuffered server-side cursor: rows are pulled from MySQL as they are
+    fetched instead of being loaded into client memory up front.
+    """
+    if DB_BACKEND == "sqlite":
+        return conn.cursor()
+    return conn.cursor(pymysql.cursors.SSCursor)
+
 
 def get_db():
     if "db" not in g:
-        g.db = pymysql.connect(host=DB_HOST, user=DB_USER, password=DB_PASS, db=DB_NAME, autocommit=False)
+        g.db = connect()
     return g.db
 
 
+def insert_row(sql, params):
+    """
+    INSERT a single row. With DB_WRITE_BEHIND=1 the row is spooled and
+    committed later in a batch by the background writer (raising
+    db_writer.BufferFull if the writer stays backed up past
+    DB_WRITE_BEHIND_SUBMIT_TIMEOUT); otherwise it is committed on the
+    request's connection before returning.
+    """
+    if WRITE_BEHIND:
+        from db_writer import get_buffer
+        get_buffer(connect).submit(sql, params)
+        return
+
+    db = get_db()
+    cur = db.cursor()
+    cur.execute(sql, params)
+    db.commit()
+
+
 def close_db(e=None):
     db = g.pop("db", None)
     if db is not None:
         db.close()
 
 
+def _ensure_column(cur, table, column, ddl):
+    if DB_BACKEND == "sqlite":
+        return db_sqlite.ensure_column(cur, table, column, ddl)
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column),
+    )
+    if cur.fetchone()[0] == 0:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def _ensure_index(cur, table, index, columns):
+    if DB_BACKEND == "sqlite":
+        return db_sqlite.ensure_index(cur, table, index, columns)
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (table, index),
+    )
+    if cur.fetchone()[0] == 0:
+        cur.execute(f"CREATE INDEX {index} ON {table} ({columns})")
+
+
 def init_db():
     db = get_db()
     cur = db.cursor()
 
-    cur.execute("CREATE DATABASE IF NOT EXISTS MINI_ATS;")
-    cur.execute("USE MINI_ATS;")
+    if DB_BACKEND != "sqlite":
+        cur.execute("CREATE DATABASE IF NOT EXISTS MINI_ATS;")
+        cur.execute("USE MINI_ATS;")
 
     cur.execute(
         """
@@ -54,10 +122,17 @@ def init_db():
             Recommended_skills BLOB NOT NULL,
             Recommended_courses BLOB NOT NULL,
             pdf_name varchar(50) NOT NULL,
+            minhash BLOB NULL,
+            dup_of varchar(512) NULL,
             PRIMARY KEY (ID)
         );
         """
     )
+    # Tables created before these columns existed
+    _ensure_column(cur, "user_data", "minhash", "BLOB NULL")
+    _ensure_column(cur, "user_data", "dup_of", "varchar(512) NULL")
+    # rescore.py updates rows by sec_token
+    _ensure_index(cur, "user_data", "idx_user_data_sec_token", "sec_token(64)")
 
     cur.execute(
         """
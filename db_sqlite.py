@@ -0,0 +1,88 @@
+import re
+import sqlite3
+from functools import lru_cache
+
+# SQLite backend for db.py (DB_BACKEND=sqlite). The rest of the app keeps
+# writing MySQL-flavoured SQL with %s placeholders; the thin wrappers below
+# translate it, so queries and schema stay defined in one place.
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers don't block the writer
+    "PRAGMA synchronous=NORMAL",    # fsync at checkpoints, not every commit (safe with WAL)
+    "PRAGMA busy_timeout=5000",     # wait for the write lock instead of failing
+    "PRAGMA cache_size=-65536",     # 64 MiB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256 MiB memory-mapped reads
+)
+
+
+@lru_cache(maxsize=256)
+def translate(sql):
+    """
+    MySQL dialect -> SQLite for the statements this app issues.
+    """
+    sql = sql.replace("%s", "?")
+    sql = sql.replace("AS UNSIGNED)", "AS INTEGER)")
+    sql = sql.replace("ID INT NOT NULL AUTO_INCREMENT", "ID INTEGER PRIMARY KEY AUTOINCREMENT")
+    sql = re.sub(r",\s*PRIMARY KEY \(ID\)", "", sql)
+    return sql
+
+
+class Cursor:
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, params=()):
+        self._cur.execute(translate(sql), tuple(params))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cur.executemany(translate(sql), (tuple(p) for p in seq_of_params))
+        return self
+
+    def __getattr__(self, name):
+        # fetchone/fetchmany/fetchall/close/description/rowcount/lastrowid
+        return getattr(self._cur, name)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+
+class Connection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *_):
+        # SQLite cursors already step through results lazily, so the
+        # unbuffered-cursor class pymysql takes here is not needed
+        return Cursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(path):
+    # check_same_thread=False: the write-behind thread owns its own
+    # connection, but it is created on whichever thread first submits
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return Connection(conn)
+
+
+def ensure_column(cur, table, column, ddl):
+    cur.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cur.fetchall()}:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def ensure_index(cur, table, index, columns):
+    # MySQL prefix lengths like sec_token(64) have no SQLite equivalent
+    columns = re.sub(r"\(\d+\)", "", columns)
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({columns})")
@@ -0,0 +1,355 @@
+import os
+import re
+import json
+import time
+import base64
+import atexit
+import logging
+import sqlite3
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+log = logging.getLogger(__name__)
+
+# Errors caused by the row itself (NOT NULL, duplicate key, value too long).
+# Retrying can't fix them, so they go to the dead-letter file instead of
+# blocking the queue; anything else is treated as a connection problem.
+_ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.DataError)
+if pymysql is not None:
+    _ROW_ERRORS += (pymysql.err.IntegrityError, pymysql.err.DataError)
+
+
+class BufferFull(RuntimeError):
+    """
+    submit() waited `submit_timeout` seconds without the writer catching up.
+    """
+
+
+def _encode_params(params):
+    # JSON has no bytes type; BLOB params (e.g. minhash) go through base64
+    return [{"b64": base64.b64encode(p).decode("ascii")} if isinstance(p, (bytes, bytearray)) else p
+            for p in params]
+
+
+def _spool_line(sql, params):
+    return json.dumps([sql, _encode_params(params)]) + "\n"
+
+
+def _parse_spool_line(line):
+    sql, params = json.loads(line)
+    return sql, tuple(base64.b64decode(p["b64"]) if isinstance(p, dict) else p for p in params)
+
+
+class WriteBehindBuffer:
+    """
+    Batches INSERTs off the request thread.
+
+    Rows are appended to a local spool file before submit() returns, then a
+    background thread groups them by statement and writes them with
+    executemany() + a single commit every `flush_interval` seconds or as soon
+    as `batch_size` rows are pending.
+
+    The spool is a series of segments: `<spool>.<n>` is appended to by
+    submit(), and `<spool>.<n>.base` holds the rows still pending when
+    segment n was started. After a successful commit the writer starts a new
+    segment under the lock, then writes and fsyncs its base file after
+    releasing it, so request threads never wait on that fsync. On start-up
+    the newest base and every segment from it on are replayed; older files
+    are left over from before the last compaction and ignored.
+
+    Delivery is at-least-once: a crash between the commit and the base file
+    landing replays (and therefore duplicates) that last batch.
+
+    If a batch fails on a constraint or data error, its rows are retried one
+    at a time and those that still fail are appended to `<spool>.dead` and
+    dropped from the queue. Only connection-level failures keep rows queued
+    for the next attempt.
+    """
+
+    def __init__(self, connect, spool_path, batch_size=100, flush_interval=1.0,
+                 max_pending=10000, fsync=False, submit_timeout=30.0):
+        self._connect = connect
+        self.spool_path = spool_path
+        self.dead_letter_path = spool_path + ".dead"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.submit_timeout = submit_timeout
+
+        self._pending = []  # [(sql, params)]
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopping = False
+        self._conn = None
+        self._spool = None
+        self._segment = -1
+
+        self._replay_spool()
+        # Start from a clean segment rather than appending after a torn line
+        self._compact(self._rotate(), list(self._pending))
+
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+
+    # --------------------
+    # Producer side
+    # --------------------
+    def submit(self, sql, params):
+        line = _spool_line(sql, params)
+        deadline = time.monotonic() + self.submit_timeout
+        with self._cond:
+            # Bounded memory: block producers until the writer catches up,
+            # but never longer than submit_timeout
+            while len(self._pending) >= self.max_pending and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise BufferFull(f"{len(self._pending)} rows pending after {self.submit_timeout:g}s")
+                self._cond.notify_all()
+                self._cond.wait(remaining)
+            if self._stopping:
+                raise RuntimeError("write-behind buffer is closed")
+            self._spool.write(line)
+            self._spool.flush()
+            if self.fsync:
+                os.fsync(self._spool.fileno())
+            self._pending.append((sql, tuple(params)))
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    # --------------------
+    # Writer side
+    # --------------------
+    def _run(self):
+        failed = False
+        while True:
+            with self._cond:
+                if not self._stopping and (failed or len(self._pending) < self.batch_size):
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+            try:
+                self.flush()
+                failed = False
+            except Exception:
+                failed = True
+                log.exception("write-behind flush failed; %d rows kept for retry", self.pending())
+            if stopping:
+                return
+
+    def flush(self):
+        """
+        Write every row pending at call time. Safe to call from any thread.
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+
+            self._write(batch)
+            self._done(len(batch))
+            return len(batch)
+
+    def _done(self, n):
+        with self._cond:
+            del self._pending[:n]
+            remaining = list(self._pending)
+            segment = self._rotate()
+            self._cond.notify_all()
+        self._compact(segment, remaining)
+
+    def _write(self, batch):
+        groups = {}
+        for sql, params in batch:
+            groups.setdefault(sql, []).append(params)
+
+        if self._conn is None:
+            self._conn = self._connect()
+        try:
+            cur = self._conn.cursor()
+            for sql, rows in groups.items():
+                for i in range(0, len(rows), self.batch_size):
+                    cur.executemany(sql, rows[i:i + self.batch_size])
+            self._conn.commit()
+        except _ROW_ERRORS:
+            self._conn.rollback()
+            self._write_rows(batch)
+        except Exception:
+            self._drop_conn()
+            raise
+
+    def _write_rows(self, batch):
+        # Slow path after a row-level failure: commit each row on its own so
+        # one bad row can't hold back the rest of the batch
+        for n, (sql, params) in enumerate(batch):
+            try:
+                cur = self._conn.cursor()
+                cur.execute(sql, params)
+                self._conn.commit()
+            except _ROW_ERRORS as exc:
+                self._conn.rollback()
+                self._dead_letter(sql, params, exc)
+            except Exception:
+                self._drop_conn()
+                # Rows before this one are committed or dead-lettered already
+                self._done(n)
+                raise
+
+    def _dead_letter(self, sql, params, exc):
+        log.error("write-behind row rejected (%s); moved to %s: %s %r",
+                  exc, self.dead_letter_path, sql, params)
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"error": str(exc), "sql": sql, "params": _encode_params(params)}) + "\n")
+
+    def _drop_conn(self):
+        try:
+            self._conn.rollback()
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    # --------------------
+    # Spool file
+    # --------------------
+    def _segments(self):
+        """
+        [(n, is_base, path)] for this spool's files, in replay order.
+        """
+        folder = os.path.dirname(self.spool_path) or "."
+        pattern = re.compile(re.escape(os.path.basename(self.spool_path)) + r"\.(\d+)(\.base)?")
+        found = []
+        for name in os.listdir(folder):
+            m = pattern.fullmatch(name)
+            if m:
+                # A base sorts before the segment it starts
+                found.append((int(m.group(1)), not m.group(2), os.path.join(folder, name)))
+        # Spool written before segments existed
+        if os.path.exists(self.spool_path):
+            found.append((-1, True, self.spool_path))
+        return [(n, not journal, path) for n, journal, path in sorted(found)]
+
+    def _replay_spool(self):
+        segments = self._segments()
+        if not segments:
+            return
+        self._segment = segments[-1][0]
+        start = max((n for n, is_base, _ in segments if is_base), default=-1)
+        for n, _, path in segments:
+            if n < start:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._pending.append(_parse_spool_line(line))
+                    except ValueError:
+                        continue  # torn last line from a crash mid-write
+        if self._pending:
+            log.warning("replaying %d spooled rows from %s", len(self._pending), self.spool_path)
+
+    def _rotate(self):
+        # Caller holds self._cond (or is __init__): later submits go to a new
+        # segment, so the files before it are only read from here on
+        if self._spool is not None:
+            self._spool.close()
+        self._segment += 1
+        self._spool = open(f"{self.spool_path}.{self._segment}", "a", encoding="utf-8")
+        return self._segment
+
+    def _compact(self, segment, rows):
+        # Runs without self._cond; _flush_lock keeps compactions in order.
+        # Once the base lands, every older file is superseded by it.
+        path = f"{self.spool_path}.{segment}.base"
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for sql, params in rows:
+                f.write(_spool_line(sql, params))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        for n, _, old in self._segments():
+            if n < segment:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        """
+        Stop the writer thread after a final flush.
+        """
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._spool.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_slot_lock = None
+
+
+def _claim_spool(base):
+    """
+    Pick a spool file no other live process is using.
+
+    Each worker holds an flock on `<spool>.<n>.lock`; a crashed worker's lock
+    is released by the OS, so the next process to start claims that slot and
+    replays whatever it left behind.
+    """
+    global _slot_lock
+    if fcntl is None:
+        return base
+    root, ext = os.path.splitext(base)
+    slot = 0
+    while True:
+        path = f"{root}.{slot}{ext}"
+        fh = open(path + ".lock", "w")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            slot += 1
+            continue
+        _slot_lock = fh
+        return path
+
+
+def get_buffer(connect):
+    """
+    Process-wide buffer configured from DB_WRITE_BEHIND_* env vars.
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            spool = _claim_spool(os.getenv("DB_WRITE_BEHIND_SPOOL", "write_behind.spool"))
+            _buffer = WriteBehindBuffer(
+                connect,
+                spool,
+                batch_size=int(os.getenv("DB_WRITE_BEHIND_BATCH", "100")),
+                flush_interval=float(os.getenv("DB_WRITE_BEHIND_INTERVAL", "1.0")),
+                max_pending=int(os.getenv("DB_WRITE_BEHIND_MAX_PENDING", "10000")),
+                fsync=os.getenv("DB_WRITE_BEHIND_FSYNC", "0") == "1",
+                submit_timeout=float(os.getenv("DB_WRITE_BEHIND_SUBMIT_TIMEOUT", "30")),
+            )
+            atexit.register(_buffer.close)
+        return _buffer
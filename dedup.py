@@ -0,0 +1,283 @@
+import os
+import re
+import time
+import zlib
+import random
+import struct
+import logging
+import threading
+
+# MinHash signatures + banded LSH for near-duplicate resumes.
+#
+# 128 permutations split into 16 bands of 8 rows: two resumes with Jaccard
+# similarity s share at least one band bucket with probability
+# 1 - (1 - s**8)**16, i.e. ~0.95 at s=0.8 and ~0.03 at s=0.5. Candidates
+# from the buckets are then verified against DEDUP_THRESHOLD.
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Below this many shingles (scanned/image-only PDFs, near-empty text) there
+# is nothing meaningful to compare, and every such resume would otherwise
+# look identical to every other
+MIN_SHINGLES = 5
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+_MERSENNE = (1 << 61) - 1
+_MAX32 = (1 << 32) - 1
+
+_rng = random.Random(1)
+_PERMS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# Stored in user_data.minhash, so fixed little-endian rather than native order
+_SIG = struct.Struct(f"<{NUM_PERM}I")
+
+log = logging.getLogger(__name__)
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    """
+    32-bit hashes of the word k-grams of `text`.
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < k:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + k]).encode()) for i in range(len(words) - k + 1)}
+
+
+def minhash(text):
+    """
+    MinHash signature of `text` as a tuple of NUM_PERM 32-bit ints, or None
+    if the text has fewer than MIN_SHINGLES shingles.
+    """
+    hashes = shingles(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    return tuple(min(((a * h + b) % _MERSENNE) & _MAX32 for h in hashes) for a, b in _PERMS)
+
+
+def similarity(sig_a, sig_b):
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def pack(sig):
+    return _SIG.pack(*sig)
+
+
+def unpack(data):
+    return _SIG.unpack(bytes(data))
+
+
+_EMPTY_SIG = pack((_MAX32,) * NUM_PERM)
+
+
+class LSHIndex:
+    """
+    In-memory band index: insert() and query() touch BANDS buckets each,
+    independent of how many signatures are stored.
+
+    Signatures are kept packed (4 bytes per permutation) and keys are
+    mapped to small ints so 100k resumes fit comfortably in a worker.
+    """
+
+    def __init__(self, threshold=DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets = [{} for _ in range(BANDS)]
+        self._keys = []
+        self._sigs = []
+        self._slots = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    @staticmethod
+    def _band_hashes(sig):
+        packed = pack(sig)
+        step = ROWS * 4
+        return [hash(packed[i * step:(i + 1) * step]) for i in range(BANDS)]
+
+    def insert(self, key, sig):
+        if key in self._slots:
+            return
+        slot = len(self._keys)
+        self._slots[key] = slot
+        self._keys.append(key)
+        self._sigs.append(pack(sig))
+        # Most buckets hold a single slot; only promote to a list on collision
+        for bucket, h in zip(self._buckets, self._band_hashes(sig)):
+            existing = bucket.get(h)
+            if existing is None:
+                bucket[h] = slot
+            elif isinstance(existing, list):
+                existing.append(slot)
+            else:
+                bucket[h] = [existing, slot]
+
+    def query(self, sig, threshold=None):
+        """
+        Return [(key, similarity)] for stored signatures at or above the
+        threshold, best match first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        candidates = set()
+        for bucket, h in zip(self._buckets, self._band_hashes(sig)):
+            found = bucket.get(h)
+            if found is None:
+                continue
+            if isinstance(found, list):
+                candidates.update(found)
+            else:
+                candidates.add(found)
+
+        matches = []
+        for slot in candidates:
+            sim = similarity(sig, unpack(self._sigs[slot]))
+            if sim >= threshold:
+                matches.append((self._keys[slot], sim))
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+
+def collapse_ranked(ranked, texts, threshold=DEDUP_THRESHOLD):
+    """
+    Collapse near-duplicates in a best-first ranking.
+
+    `ranked` is [(key, score)] sorted best first and `texts` maps key to
+    resume text. Returns [(key, score, [duplicate keys])], keeping the
+    best-scoring entry of each near-duplicate group. Entries without enough
+    text for a signature are never grouped.
+    """
+    index = LSHIndex(threshold)
+    kept = []
+    position = {}
+    for key, score in ranked:
+        sig = minhash(texts.get(key, ""))
+        if sig is None:
+            kept.append((key, score, []))
+            continue
+        matches = index.query(sig)
+        if matches:
+            kept[position[matches[0][0]]][2].append(key)
+            continue
+        index.insert(key, sig)
+        position[key] = len(kept)
+        kept.append((key, score, []))
+    return kept
+
+
+class ResumePool:
+    """
+    LSH index over the signatures stored in user_data, keyed by sec_token.
+
+    warm() loads the table on a background thread at startup; after that
+    each lookup tops the index up with rows above the highest ID seen.
+    Rows can commit out of ID order (concurrent transactions, the
+    write-behind writer in other workers), so IDs skipped over by that scan
+    are remembered and re-checked on every refresh for GAP_TTL seconds.
+    """
+
+    GAP_TTL = 600.0
+    MAX_GAP = 1000  # IDs tracked per hole; older history is assumed settled
+
+    def __init__(self, threshold=DEDUP_THRESHOLD):
+        self.index = LSHIndex(threshold)
+        self._last_id = 0
+        self._missing = {}  # ID -> time first skipped
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._warm_thread = None
+
+    def warm(self, connect):
+        """
+        Load every stored signature on a daemon thread using its own
+        connection. Lookups made meanwhile see whatever is loaded so far.
+        """
+        def run():
+            try:
+                db = connect()
+                try:
+                    self.refresh(db)
+                finally:
+                    db.close()
+            except Exception:
+                log.exception("could not preload near-duplicate index")
+            log.info("near-duplicate index loaded: %d resumes", len(self.index))
+
+        self._warm_thread = threading.Thread(target=run, name="dedup-warm", daemon=True)
+        self._warm_thread.start()
+
+    def _warming(self):
+        # A thread started before a fork (gunicorn --preload) is not alive
+        # in the worker, which then loads lazily instead
+        return self._warm_thread is not None and self._warm_thread.is_alive()
+
+    def _insert_rows(self, rows, now):
+        with self._lock:
+            for row_id, token, blob in rows:
+                self._missing.pop(row_id, None)
+                if row_id > self._last_id:
+                    for gap in range(max(self._last_id + 1, row_id - self.MAX_GAP), row_id):
+                        self._missing.setdefault(gap, now)
+                    self._last_id = row_id
+                # _EMPTY_SIG: written for empty text before MIN_SHINGLES existed
+                if blob is not None and bytes(blob) != _EMPTY_SIG:
+                    self.index.insert(token, unpack(blob))
+
+    def refresh(self, db, chunk_size=1000):
+        with self._refresh_lock:
+            now = time.monotonic()
+            cur = db.cursor()
+
+            with self._lock:
+                self._missing = {i: t for i, t in self._missing.items() if now - t < self.GAP_TTL}
+                missing = sorted(self._missing)
+            for i in range(0, len(missing), chunk_size):
+                ids = missing[i:i + chunk_size]
+                cur.execute(
+                    "SELECT ID, sec_token, minhash FROM user_data WHERE ID IN (%s)" % ",".join(["%s"] * len(ids)),
+                    ids,
+                )
+                self._insert_rows(cur.fetchall(), now)
+
+            # No minhash filter: rows from before the column existed must
+            # still advance the scan rather than look like holes
+            cur.execute(
+                "SELECT ID, sec_token, minhash FROM user_data WHERE ID > %s ORDER BY ID",
+                (self._last_id,),
+            )
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                self._insert_rows(rows, now)
+
+    def find_duplicate(self, db, sig):
+        """
+        sec_token of the closest stored near-duplicate, or None (always
+        None for a None signature).
+        """
+        if sig is None:
+            return None
+        if not self._warming():
+            self.refresh(db)
+        with self._lock:
+            matches = self.index.query(sig)
+        return matches[0][0] if matches else None
+
+    def add(self, token, sig):
+        if sig is None:
+            return
+        with self._lock:
+            self.index.insert(token, sig)
+
+
+pool = ResumePool()
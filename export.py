@@ -0,0 +1,242 @@
+import io
+import os
+import csv
+import sys
+import hmac
+import json
+import argparse
+from flask import Blueprint, Response, request, stream_with_context, abort
+from db import connect, stream_cursor
+
+# Streams user_data / user_feedback out of MySQL with an unbuffered
+# server-side cursor, so memory stays flat however large the table is.
+#
+#   GET /admin/export/user_data?format=jsonl&since_id=1200   (HTTP basic auth)
+#   python export.py user_data --format csv --state-file .last_user_data_id
+#
+# IDs are assigned at INSERT but rows become visible at COMMIT, so a row can
+# appear after a higher ID has already been exported (concurrent requests,
+# the write-behind writer). Incremental runs should therefore restart a few
+# IDs behind the last one seen and upsert on ID: --state-file does this
+# with --overlap, and HTTP callers should do the same with since_id.
+
+export_blueprint = Blueprint("export", __name__)
+
+FETCH_SIZE = 500
+DEFAULT_OVERLAP = 1000
+
+TABLES = {
+    "user_data": [
+        "ID", "sec_token", "act_name", "act_mail", "act_mob", "Name", "Email_ID", "resume_score",
+        "Timestamp", "Page_no", "Predicted_Field", "User_level", "Actual_skills", "Recommended_skills",
+        "Recommended_courses", "pdf_name", "dup_of", "ip_add", "host_name", "dev_user", "os_name_ver",
+        "latlong", "city", "state", "country",
+    ],
+    "user_feedback": ["ID", "feed_name", "feed_email", "feed_score", "comments", "Timestamp"],
+}
+
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def build_query(table, since_id=None, since_ts=None, until_ts=None, field=None, min_score=None, limit=None):
+    """
+    SELECT for an export, ordered by ID so `since_id` resumes where the last
+    run stopped. Timestamps use the stored "%Y-%m-%d_%H:%M:%S" format, which
+    sorts lexicographically.
+    """
+    if table not in TABLES:
+        raise ValueError(f"unknown table: {table}")
+
+    where, params = [], []
+    if since_id is not None:
+        where.append("ID > %s")
+        params.append(int(since_id))
+    if since_ts:
+        where.append("Timestamp >= %s")
+        params.append(since_ts)
+    if until_ts:
+        where.append("Timestamp < %s")
+        params.append(until_ts)
+    if table == "user_data":
+        if field:
+            where.append("Predicted_Field = %s")
+            params.append(field)
+        if min_score is not None:
+            where.append("CAST(resume_score AS UNSIGNED) >= %s")
+            params.append(int(min_score))
+
+    sql = f"SELECT {', '.join(TABLES[table])} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ID"
+    if limit:
+        sql += " LIMIT %s"
+        params.append(int(limit))
+    return sql, params
+
+
+def _value(v):
+    return v.decode("utf-8", errors="replace") if isinstance(v, (bytes, bytearray)) else v
+
+
+def iter_rows(table, **filters):
+    """
+    Yield export rows as dicts, holding at most FETCH_SIZE rows at a time.
+    Uses its own connection: an unbuffered cursor must be drained before
+    its connection can run anything else.
+    """
+    sql, params = build_query(table, **filters)
+    columns = TABLES[table]
+    conn = connect()
+    try:
+        cur = stream_cursor(conn)
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield {c: _value(v) for c, v in zip(columns, row)}
+        cur.close()
+    finally:
+        conn.close()
+
+
+def iter_csv(table, rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=TABLES[table])
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % FETCH_SIZE == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+    yield buf.getvalue()
+
+
+def iter_jsonl(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(row, ensure_ascii=False, default=str))
+        if len(chunk) == FETCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def serialize(table, rows, fmt):
+    if fmt == "csv":
+        return iter_csv(table, rows)
+    if fmt == "jsonl":
+        return iter_jsonl(rows)
+    raise ValueError(f"unknown format: {fmt}")
+
+
+def _authorized():
+    auth = request.authorization
+    if auth is None or auth.username is None or auth.password is None:
+        return False
+    return (hmac.compare_digest(auth.username, os.getenv("ADMIN_USER", "admin"))
+            and hmac.compare_digest(auth.password, os.getenv("ADMIN_PASS", "admin@resume-analyzer")))
+
+
+def _int_arg(name):
+    # args.get(type=int) turns a malformed value into None, which would
+    # silently widen the export (e.g. since_id=abc -> whole table)
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        abort(400)
+
+
+@export_blueprint.get("/<table>")
+def export_table(table):
+    if not _authorized():
+        return Response("Authentication required", 401, {"WWW-Authenticate": 'Basic realm="export"'})
+    if table not in TABLES:
+        abort(404)
+    fmt = request.args.get("format", "csv")
+    if fmt not in FORMATS:
+        abort(400)
+
+    args = request.args
+    filters = dict(
+        since_id=_int_arg("since_id"),
+        since_ts=args.get("since_ts"),
+        until_ts=args.get("until_ts"),
+        field=args.get("field"),
+        min_score=_int_arg("min_score"),
+        limit=_int_arg("limit"),
+    )
+
+    body = serialize(table, iter_rows(table, **filters), fmt)
+    return Response(
+        stream_with_context(body),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={table}.{fmt}"},
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream user_data / user_feedback as CSV or JSONL.")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="jsonl")
+    parser.add_argument("--output", "-o", help="file to write (default: stdout)")
+    parser.add_argument("--since-id", type=int, help="only rows with ID greater than this")
+    parser.add_argument("--state-file", help="read/write the last exported ID here for incremental runs")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP,
+                        help="with --state-file, re-export this many IDs before the saved one to catch "
+                             "rows that committed late; consumers should upsert on ID "
+                             f"(default: {DEFAULT_OVERLAP})")
+    parser.add_argument("--since-ts", help="Timestamp lower bound, e.g. 2024-01-31_00:00:00")
+    parser.add_argument("--until-ts", help="Timestamp upper bound (exclusive)")
+    parser.add_argument("--field", help="Predicted_Field to match (user_data only)")
+    parser.add_argument("--min-score", type=int, help="minimum resume_score (user_data only)")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    since_id = args.since_id
+    last_id = [since_id]
+    if since_id is None and args.state_file and os.path.exists(args.state_file):
+        with open(args.state_file) as f:
+            last_id[0] = int(f.read().strip() or 0)
+        since_id = max(0, last_id[0] - args.overlap)
+
+    def tracked(rows):
+        for row in rows:
+            # Rows in the overlap sit below the checkpoint; never move it back
+            if last_id[0] is None or row["ID"] > last_id[0]:
+                last_id[0] = row["ID"]
+            yield row
+
+    rows = tracked(iter_rows(
+        args.table, since_id=since_id, since_ts=args.since_ts, until_ts=args.until_ts,
+        field=args.field, min_score=args.min_score, limit=args.limit,
+    ))
+
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for chunk in serialize(args.table, rows, args.format):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    # Only advance the checkpoint after the whole export was written
+    if args.state_file and last_id[0] is not None:
+        tmp = args.state_file + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(last_id[0]))
+        os.replace(tmp, args.state_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, url_for
-import os, fitz
-from sentence_transformers import SentenceTransformer, util
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+import os, time, threading
+import numpy as np
+import metrics
+import model_client
+import dedup
+from pyresparer.utils import extract_pdf_text, ExtractionLimitExceeded
 
 
 
@@ -9,17 +13,44 @@ jd_blueprint = Blueprint("jd_match", __name__, template_folder="templates")
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+MODEL_NAME = 'all-MiniLM-L6-v2'
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    # Loaded on first use, and only when no model server is answering
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            start = time.perf_counter()
+            _model = SentenceTransformer(MODEL_NAME)
+            metrics.set_gauge("ats_model_load_seconds", time.perf_counter() - start, model=MODEL_NAME)
+    return _model
+
+
+def encode(texts):
+    embeddings = model_client.encode(texts)
+    if embeddings is None:
+        embeddings = get_model().encode(texts, batch_size=len(texts), convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def cosine_similarities(query, rows):
+    query = query / (np.linalg.norm(query) or 1.0)
+    norms = np.linalg.norm(rows, axis=1)
+    norms[norms == 0] = 1.0
+    return (rows @ query) / norms
+
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() == "pdf"
 
 def extract_text_from_pdf(pdf_path):
-    text = ""
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
+    # Same isolated child and PDF_* budgets as /analyze; raises
+    # ExtractionLimitExceeded for a document that blows them
+    return extract_pdf_text(pdf_path)
 
 
 @jd_blueprint.route("/", methods=["GET", "POST"])
@@ -32,20 +63,41 @@ def jd_results():
     uploaded_files = request.files.getlist("resumes")
 
     candidates = []
+    rejected = []
     for file in uploaded_files:
         if file and allowed_file(file.filename):
+            metrics.inc("ats_uploads_total", endpoint="jd_match")
             file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-            file.save(file_path)
-            resume_text = extract_text_from_pdf(file_path)
+            with metrics.timed("jd_save"):
+                file.save(file_path)
+            try:
+                with metrics.timed("jd_extract_text"):
+                    resume_text = extract_text_from_pdf(file_path)
+            except ExtractionLimitExceeded:
+                metrics.inc("ats_parse_failures_total")
+                rejected.append(file.filename)
+                continue
             candidates.append((file.filename, resume_text))
 
-    jd_embedding = model.encode(job_description, convert_to_tensor=True)
+    if rejected:
+        flash("Skipped resumes we could not read: " + ", ".join(rejected))
+
     ranked_candidates = []
-    for filename, resume_text in candidates:
-        resume_embedding = model.encode(resume_text, convert_to_tensor=True)
-        similarity = util.pytorch_cos_sim(jd_embedding, resume_embedding).item()
-        ranked_candidates.append((filename, similarity))
+    if candidates:
+        # One batched encode for the JD and every resume
+        try:
+            with metrics.timed("jd_encode"):
+                embeddings = encode([job_description] + [text for _, text in candidates])
+        except model_client.ModelServerError:
+            flash("We're busy matching other resumes right now. Please try again in a minute.")
+            return redirect(url_for("jd_match.jd_match_page"))
+        similarities = cosine_similarities(embeddings[0], embeddings[1:])
+        ranked_candidates = [(filename, float(sim)) for (filename, _), sim in zip(candidates, similarities)]
 
     ranked_candidates.sort(key=lambda x: x[1], reverse=True)
 
+    # Resubmitted, lightly edited resumes collapse into their best match
+    with metrics.timed("jd_dedup"):
+        ranked_candidates = dedup.collapse_ranked(ranked_candidates, dict(candidates))
+
     return render_template("jd_results.html", candidates=ranked_candidates)
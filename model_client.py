@@ -0,0 +1,174 @@
+import os
+import json
+import logging
+import time
+import socket
+import struct
+import threading
+import metrics
+
+# Client for model_server.py. Web workers send parse/encode requests over a
+# Unix socket instead of each loading en_core_web_trf and all-MiniLM-L6-v2.
+# With MODEL_SERVER_SOCKET unset, or while nothing is listening on it, every
+# call returns None and callers fall back to their in-process model; so does
+# an op the server was started without (--models). A server
+# that is up but slow or failing raises ModelServerError instead: loading the
+# transformer into every worker exactly when the server is backed up would
+# bring back the memory pressure the server exists to remove.
+
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", "60"))
+RETRY_AFTER = 30.0
+
+_LEN = struct.Struct(">I")
+
+log = logging.getLogger(__name__)
+
+# Nothing listening: the socket file is missing or the server isn't accepting
+_UNREACHABLE = (FileNotFoundError, ConnectionRefusedError)
+
+
+class ModelServerError(RuntimeError):
+    """
+    The model server is reachable but timed out or failed the request.
+    """
+
+
+# --------------------
+# Framing (shared with model_server.py)
+# --------------------
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("model server closed the connection")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def send_frame(sock, header, payload=b""):
+    head = json.dumps(header).encode("utf-8")
+    sock.sendall(_LEN.pack(len(head)) + head + _LEN.pack(len(payload)) + payload)
+
+
+def recv_frame(sock):
+    head = _recv_exact(sock, _LEN.unpack(_recv_exact(sock, _LEN.size))[0])
+    payload = _recv_exact(sock, _LEN.unpack(_recv_exact(sock, _LEN.size))[0])
+    return json.loads(head), payload
+
+
+class ModelClient:
+    """
+    One persistent connection per thread. A failed connect marks the server
+    down for RETRY_AFTER seconds so requests go straight to the in-process
+    fallback meanwhile.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._down_until = 0.0
+        self._unsupported_until = {}  # op -> monotonic time to ask again
+
+    def _sock(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(MODEL_SERVER_TIMEOUT)
+            sock.connect(self.path)
+            self._local.sock = sock
+        return sock
+
+    def _drop(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def request(self, op, texts):
+        now = time.monotonic()
+        if now < self._down_until or now < self._unsupported_until.get(op, 0.0):
+            return None
+        body = json.dumps(texts).encode("utf-8")
+        # A pooled connection may be stale after a server restart, so a
+        # reset on a reused socket gets one retry on a fresh one
+        for attempt in range(2):
+            reused = getattr(self._local, "sock", None) is not None
+            try:
+                sock = self._sock()
+            except _UNREACHABLE:
+                self._drop()
+                self._down_until = time.monotonic() + RETRY_AFTER
+                metrics.inc("ats_model_server_fallbacks_total", op=op)
+                return None
+            except OSError as exc:
+                self._drop()
+                raise ModelServerError(f"cannot connect to model server: {exc}") from exc
+            try:
+                send_frame(sock, {"op": op}, body)
+                header, payload = recv_frame(sock)
+                break
+            except socket.timeout as exc:
+                # Busy, not dead: the reply may still arrive, so this socket
+                # is out of sync and must not be reused
+                self._drop()
+                metrics.inc("ats_model_server_errors_total", op=op, reason="timeout")
+                raise ModelServerError(f"model server {op} timed out after {MODEL_SERVER_TIMEOUT:g}s") from exc
+            except (OSError, ConnectionError, ValueError) as exc:
+                self._drop()
+                if reused and attempt == 0:
+                    continue
+                metrics.inc("ats_model_server_errors_total", op=op, reason="connection")
+                raise ModelServerError(f"model server {op} failed: {exc}") from exc
+        if header.get("unsupported"):
+            # Started with --models not including this op; re-ask after
+            # RETRY_AFTER in case it is restarted with it
+            log.info("model server does not serve %s; using in-process model", op)
+            self._unsupported_until[op] = time.monotonic() + RETRY_AFTER
+            metrics.inc("ats_model_server_fallbacks_total", op=op)
+            return None
+        if not header.get("ok"):
+            log.warning("model server %s failed: %s", op, header.get("error"))
+            metrics.inc("ats_model_server_errors_total", op=op, reason="server")
+            raise ModelServerError(f"model server {op} failed: {header.get('error')}")
+        return header, payload
+
+
+_client = ModelClient(MODEL_SERVER_SOCKET) if MODEL_SERVER_SOCKET else None
+
+
+def parse(texts, vocab):
+    """
+    spaCy Docs for `texts` from the shared en_core_web_trf, rebuilt on
+    `vocab`; None if no server is configured or listening. Raises
+    ModelServerError if the server is up but times out or fails.
+    """
+    if _client is None:
+        return None
+    with metrics.timed("model_server_parse"):
+        result = _client.request("parse", list(texts))
+    if result is None:
+        return None
+    from spacy.tokens import DocBin
+    return list(DocBin().from_bytes(result[1]).get_docs(vocab))
+
+
+def encode(texts):
+    """
+    float32 sentence embeddings (one row per text) from the shared
+    all-MiniLM-L6-v2; None if no server is configured or listening.
+    Raises ModelServerError if the server is up but times out or fails.
+    """
+    if _client is None:
+        return None
+    with metrics.timed("model_server_encode"):
+        result = _client.request("encode", list(texts))
+    if result is None:
+        return None
+    import numpy as np
+    header, payload = result
+    return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import queue
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from concurrent.futures import Future
+from model_client import send_frame, recv_frame
+
+# Local inference sidecar: one process holds en_core_web_trf and
+# all-MiniLM-L6-v2 for every web worker on the host and serves them over a
+# Unix socket. Concurrent requests are coalesced into micro-batches: a batch
+# runs as soon as it reaches --max-batch texts or --max-wait-ms after its
+# first text arrived, whichever comes first.
+#
+#   python model_server.py --socket /tmp/ats-models.sock
+#   MODEL_SERVER_SOCKET=/tmp/ats-models.sock gunicorn -w 4 app:app
+
+log = logging.getLogger("model_server")
+
+ENCODER_MODEL = "all-MiniLM-L6-v2"
+
+
+class MicroBatcher:
+    """
+    Runs `fn(list_of_texts) -> list_of_results` on batches gathered from
+    many caller threads.
+    """
+
+    def __init__(self, name, fn, max_batch=16, max_wait_ms=5.0):
+        self.name = name
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        futures = []
+        for text in texts:
+            fut = Future()
+            self._queue.put((text, fut))
+            futures.append(fut)
+        return [fut.result() for fut in futures]
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                results = self.fn(texts)
+            except Exception as exc:
+                log.exception("%s batch of %d failed", self.name, len(batch))
+                for _, fut in batch:
+                    fut.set_exception(exc)
+                continue
+            for (_, fut), result in zip(batch, results):
+                fut.set_result(result)
+            log.debug("%s batch size %d", self.name, len(batch))
+
+
+def build_batchers(max_batch, max_wait_ms, load=("parse", "encode")):
+    batchers = {}
+
+    if "parse" in load:
+        from pyresparer.resume_parser import load_nlp_model
+        nlp = load_nlp_model()
+        batchers["parse"] = MicroBatcher(
+            "parse", lambda texts: list(nlp.pipe(texts, batch_size=len(texts))), max_batch, max_wait_ms
+        )
+
+    if "encode" in load:
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer(ENCODER_MODEL)
+        batchers["encode"] = MicroBatcher(
+            "encode",
+            lambda texts: list(encoder.encode(texts, batch_size=len(texts), convert_to_numpy=True)),
+            max_batch,
+            max_wait_ms,
+        )
+
+    return batchers
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Connections are persistent: one frame in, one frame out, repeat
+        sock = self.connection
+        while True:
+            try:
+                header, payload = recv_frame(sock)
+            except (ConnectionError, OSError):
+                return
+            try:
+                send_frame(sock, *self.server.dispatch(header, payload))
+            except (ConnectionError, OSError):
+                return
+
+
+class ModelServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, batchers):
+        self.batchers = batchers
+        super().__init__(path, _Handler)
+
+    def dispatch(self, header, payload):
+        op = header.get("op")
+        batcher = self.batchers.get(op)
+        if batcher is None:
+            # Distinct from a failure: the client runs this op in-process
+            return {"ok": False, "unsupported": True, "error": f"unsupported op: {op}"}, b""
+        try:
+            results = batcher.submit(json.loads(payload))
+        except Exception as exc:
+            return {"ok": False, "error": str(exc)}, b""
+
+        if op == "parse":
+            from spacy.tokens import DocBin
+            return {"ok": True}, DocBin(docs=results).to_bytes()
+
+        import numpy as np
+        arr = np.asarray(results, dtype=np.float32)
+        return {"ok": True, "shape": list(arr.shape)}, arr.tobytes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared spaCy/SentenceTransformer inference server.")
+    parser.add_argument("--socket", default=os.getenv("MODEL_SERVER_SOCKET", "/tmp/ats-models.sock"))
+    parser.add_argument("--max-batch", type=int, default=int(os.getenv("MODEL_SERVER_MAX_BATCH", "16")))
+    parser.add_argument("--max-wait-ms", type=float, default=float(os.getenv("MODEL_SERVER_MAX_WAIT_MS", "5")))
+    parser.add_argument("--models", default="parse,encode", help="comma-separated subset of parse,encode")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    if os.path.exists(args.socket):
+        # Refuse to steal the socket from a live server
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(args.socket)
+        except OSError:
+            os.remove(args.socket)
+        else:
+            probe.close()
+            raise SystemExit(f"another model server is listening on {args.socket}")
+
+    batchers = build_batchers(args.max_batch, args.max_wait_ms, load=args.models.split(","))
+    server = ModelServer(args.socket, batchers)
+    log.info("serving %s on %s (max_batch=%d, max_wait_ms=%.1f)",
+             ",".join(batchers), args.socket, args.max_batch, args.max_wait_ms)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# pyresparer/layout.py
+import io
+import os
+import re
+import statistics
+
+try:
+    import fitz  # PyMuPDF
+except Exception:  # pragma: no cover
+    fitz = None
+
+from . import utils
+
+# Name/contact from the header block of page 1, using font sizes and
+# positions instead of NER. Most resumes set the candidate's name as the
+# largest text at the very top; when that pattern is clear the caller can
+# skip the transformer pass entirely.
+#
+# That skip is opt-in (LAYOUT_SKIP_NER=1). LAYOUT_MIN_CONFIDENCE has only been
+# tuned on benchmarks/make_layout_corpus.py, whose header styles were written
+# alongside these rules, so its precision there says little about real
+# resumes, and agreement and speedup against NER haven't been measured yet.
+# Run bench_layout.py --labels on hand-labelled real resumes before enabling it.
+
+HEADER_FRACTION = 0.25
+LAYOUT_SKIP_NER = os.getenv("LAYOUT_SKIP_NER", "0") == "1"
+LAYOUT_MIN_CONFIDENCE = float(os.getenv("LAYOUT_MIN_CONFIDENCE", "0.75"))
+
+_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z.'\-]*(\s+[A-Za-z][A-Za-z.'\-]*){0,3}$")
+_NOT_NAMES = {
+    "resume", "curriculum vitae", "cv", "bio data", "biodata", "profile", "summary",
+    "objective", "contact", "education", "experience", "skills", "personal details",
+}
+# Job titles and section headings are the usual large text above or near the
+# name; a line containing any of these words is never taken as the name
+_NOT_NAME_WORDS = {
+    "engineer", "developer", "analyst", "designer", "manager", "scientist", "consultant", "intern",
+    "architect", "administrator", "specialist", "officer", "executive", "associate", "director",
+    "programmer", "tester", "student", "fresher", "summary", "objective", "experience", "skills",
+    "profile", "education", "projects", "certifications", "achievements", "contact", "career",
+    "professional", "technical", "employment", "history", "references", "declaration", "interests",
+    "hobbies", "languages", "resume", "vitae",
+}
+
+
+def _open(file_path_or_bytes):
+    if isinstance(file_path_or_bytes, io.BytesIO):
+        return fitz.open(stream=file_path_or_bytes.getvalue(), filetype="pdf")
+    return fitz.open(file_path_or_bytes)
+
+
+def _lines(page):
+    """
+    Text lines of a page as (text, max font size, top y, char count).
+    """
+    out = []
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        for line in block["lines"]:
+            spans = [s for s in line["spans"] if s["text"].strip()]
+            if not spans:
+                continue
+            text = " ".join(" ".join(s["text"].split()) for s in spans)
+            size = max(s["size"] for s in spans)
+            out.append((text, size, line["bbox"][1], sum(len(s["text"].strip()) for s in spans)))
+    return out
+
+
+def _looks_like_name(text):
+    lowered = text.lower()
+    return (bool(_NAME_RE.match(text)) and lowered not in _NOT_NAMES
+            and not _NOT_NAME_WORDS.intersection(lowered.split()))
+
+
+def _email_score(name, email):
+    """
+    1.0 if a name token of 3+ letters appears in the email's local part,
+    0.0 if it doesn't, 0.5 when there is no email to compare against.
+    """
+    if not email:
+        return 0.5
+    local = re.sub(r"[^a-z]", "", email.split("@")[0].lower())
+    tokens = (re.sub(r"[^a-z]", "", t.lower()) for t in name.split())
+    return 1.0 if any(len(t) >= 3 and t in local for t in tokens) else 0.0
+
+
+def extract_header_fields(file_path_or_bytes):
+    """
+    Return {name, email, mobile_number, confidence} from the header block of
+    page 1, or None if the document can't be read with PyMuPDF.
+
+    confidence (0..1) combines how much larger the name is than body text,
+    whether it is the first line on the page, whether it has a typical 2-3
+    word shape and whether it matches the email address. The weights and
+    LAYOUT_MIN_CONFIDENCE come from benchmarks/bench_layout.py --labels.
+    """
+    if fitz is None:
+        return None
+
+    with _open(file_path_or_bytes) as doc:
+        if doc.page_count == 0:
+            return None
+        page = doc[0]
+        lines = _lines(page)
+        links = [l.get("uri", "") for l in page.get_links()]
+        header_limit = page.rect.height * HEADER_FRACTION
+
+    if not lines:
+        return None
+
+    # Body size = the size most characters on the page are set in
+    sizes = []
+    for _, size, _, chars in lines:
+        sizes.extend([round(size, 1)] * chars)
+    body_size = statistics.median(sizes)
+
+    header = sorted((ln for ln in lines if ln[2] <= header_limit), key=lambda ln: ln[2])
+    header_text = "\n".join(ln[0] for ln in header)
+
+    email = utils.extract_email(header_text)
+    if not email:
+        for uri in links:
+            if uri.lower().startswith("mailto:"):
+                email = uri[len("mailto:"):].split("?")[0] or None
+                break
+
+    name, confidence = None, 0.0
+    candidates = [ln for ln in header if _looks_like_name(ln[0])]
+    if candidates:
+        # A line matching the email wins, then the largest font, then the
+        # topmost line; a big tagline above the name loses to the name
+        best = max(candidates, key=lambda ln: (_email_score(ln[0], email), ln[1], -ln[2]))
+        text, size, top, _ = best
+        following = header[header.index(best) + 1:]
+        if len(text.split()) == 1 and following:
+            # First name and surname stacked on two lines of the same size
+            nxt = following[0]
+            if abs(nxt[1] - size) < 0.5 and len(nxt[0].split()) <= 2 and _looks_like_name(nxt[0]):
+                text = f"{text} {nxt[0]}"
+        words = len(text.split())
+        size_score = min(max((size / body_size - 1.0) / 0.3, 0.0), 1.0)
+        first_line = 1.0 if header and header[0][2] == top else 0.0
+        shape = 1.0 if 2 <= words <= 3 else 0.5 if words == 4 else 0.0
+        name = text
+        confidence = (0.35 * size_score + 0.15 * first_line + 0.2 * shape
+                      + 0.3 * _email_score(text, email))
+
+    return {
+        "name": name,
+        "email": email,
+        "mobile_number": utils.extract_mobile_number(header_text),
+        "confidence": round(confidence, 3),
+    }
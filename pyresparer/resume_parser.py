@@ -1,11 +1,69 @@
 
 import os
 import io
+import time
+import threading
 import spacy
 from spacy.language import Language
 from spacy.pipeline import Sentencizer
 from typing import Optional, Dict, Any
+import metrics
+import model_client
 from . import utils
+from . import layout
+
+_NLP_MODEL: Optional[Language] = None
+_TOKENIZER: Optional[Language] = None
+# Separate locks so a tokenizer-only parse never waits on the transformer load
+_nlp_lock = threading.Lock()
+_tokenizer_lock = threading.Lock()
+
+
+def load_nlp_model() -> Language:
+    """
+    Load en_core_web_trf once per process and reuse it for every parse.
+    Concurrent first requests wait for a single load rather than each
+    loading their own copy.
+    """
+    global _NLP_MODEL
+    if _NLP_MODEL is not None:
+        metrics.inc("ats_cache_hits_total", cache="spacy_model")
+        return _NLP_MODEL
+
+    with _nlp_lock:
+        if _NLP_MODEL is not None:
+            metrics.inc("ats_cache_hits_total", cache="spacy_model")
+            return _NLP_MODEL
+
+        metrics.inc("ats_cache_misses_total", cache="spacy_model")
+        start = time.perf_counter()
+        try:
+            nlp = spacy.load("en_core_web_trf")
+        except OSError as exc:
+            raise RuntimeError(
+                "spaCy model 'en_core_web_trf' not found. "
+                "Install it with: python -m spacy download en_core_web_trf"
+            ) from exc
+
+        if "sentencizer" not in nlp.pipe_names:
+            nlp.add_pipe("sentencizer", first=True)
+
+        metrics.set_gauge("ats_model_load_seconds", time.perf_counter() - start, model="en_core_web_trf")
+        _NLP_MODEL = nlp
+        return nlp
+
+
+def load_tokenizer() -> Language:
+    """
+    Tokenizer-only English pipeline for parses that don't need NER.
+    """
+    global _TOKENIZER
+    if _TOKENIZER is None:
+        with _tokenizer_lock:
+            if _TOKENIZER is None:
+                _TOKENIZER = spacy.blank("en")
+    return _TOKENIZER
+
 
 class ResumeParser:
     """
@@ -15,34 +73,55 @@ class ResumeParser:
       - resume: path (str) or io.BytesIO containing the resume file
       - skills_file: optional path to newline-separated skill list
       - custom_regex: optional custom regex for phone numbers
+      - use_layout: read name/email/phone from the PDF header layout and skip
+        the transformer when that is confident (LAYOUT_MIN_CONFIDENCE);
+        defaults to LAYOUT_SKIP_NER, which is off
 
     Output (get_extracted_data):
       dict with keys: name, email, mobile_number, skills, degree, no_of_pages, raw_text
     """
 
-    def __init__(self, resume: Any, skills_file: Optional[str] = None, custom_regex: Optional[str] = None):
+    def __init__(self, resume: Any, skills_file: Optional[str] = None, custom_regex: Optional[str] = None,
+                 use_layout: Optional[bool] = None):
         self.resume = resume
         self.skills_file = skills_file
         self.custom_regex = custom_regex
 
-        try:
-            self._nlp_model: Language = spacy.load("en_core_web_trf")
-        except OSError as exc:
-            raise RuntimeError(
-                "spaCy model 'en_core_web_trf' not found. "
-                "Install it with: python -m spacy download en_core_web_trf"
-            ) from exc
-
-        if "sentencizer" not in self._nlp_model.pipe_names:
-            self._nlp_model.add_pipe("sentencizer", first=True)
-
         ext = self._detect_ext(self.resume)
-        self.raw_text = utils.extract_text(self.resume, ext) or ""
+        with metrics.timed("parser_extract_text"):
+            self.raw_text = utils.extract_text(self.resume, ext) or ""
         self.text = " ".join(self.raw_text.split())
 
-        self.doc = self._nlp_model(self.text)
-
-        self.noun_chunks = list(self.doc.noun_chunks)
+        if use_layout is None:
+            use_layout = layout.LAYOUT_SKIP_NER
+        self.layout: Optional[Dict[str, Any]] = None
+        if use_layout and (ext or "").lower() == ".pdf":
+            try:
+                with metrics.timed("parser_layout"):
+                    self.layout = layout.extract_header_fields(self.resume)
+            except Exception:
+                self.layout = None
+        self.layout_confident = bool(
+            self.layout and self.layout.get("name")
+            and self.layout["confidence"] >= layout.LAYOUT_MIN_CONFIDENCE
+        )
+        metrics.inc("ats_layout_name_total", result="hit" if self.layout_confident else "fallback")
+
+        if self.layout_confident or not self.text:
+            # Skills and degrees only need the text, so a tokenized doc is
+            # enough (and there is nothing for NER in an empty one)
+            self.doc = load_tokenizer()(self.text)
+            self.noun_chunks = []
+        else:
+            # Prefer the shared model server; load the model here only without one
+            docs = model_client.parse([self.text], load_tokenizer().vocab)
+            if docs:
+                self.doc = docs[0]
+            else:
+                self._nlp_model: Language = load_nlp_model()
+                with metrics.timed("parser_nlp"):
+                    self.doc = self._nlp_model(self.text)
+            self.noun_chunks = list(self.doc.noun_chunks)
 
         self.details: Dict[str, Any] = {
             "name": None,
@@ -59,7 +138,8 @@ class ResumeParser:
 
     def _detect_ext(self, path_or_file) -> Optional[str]:
         if isinstance(path_or_file, io.BytesIO):
-            return getattr(path_or_file, "name", None)
+            name = getattr(path_or_file, "name", None)
+            return os.path.splitext(name)[1] if name else None
         if isinstance(path_or_file, str):
             return os.path.splitext(path_or_file)[1]
         return None
@@ -93,18 +173,26 @@ class ResumeParser:
         return None
 
     def _get_basic_details(self):
+        header = self.layout or {}
+
         try:
-            self.details["name"] = self._get_person_from_doc()
+            if self.layout_confident:
+                self.details["name"] = header["name"]
+            else:
+                self.details["name"] = self._get_person_from_doc()
         except Exception:
             self.details["name"] = None
 
         try:
-            self.details["email"] = utils.extract_email(self.text)
+            self.details["email"] = header.get("email") or utils.extract_email(self.text)
         except Exception:
             self.details["email"] = None
 
         try:
-            self.details["mobile_number"] = utils.extract_mobile_number(self.text, self.custom_regex)
+            if header.get("mobile_number") and not self.custom_regex:
+                self.details["mobile_number"] = header["mobile_number"]
+            else:
+                self.details["mobile_number"] = utils.extract_mobile_number(self.text, self.custom_regex)
         except Exception:
             self.details["mobile_number"] = None
 
@@ -127,7 +215,8 @@ class ResumeParser:
             self.details["degree"] = None
 
         try:
-            self.details["no_of_pages"] = utils.get_number_of_pages(self.resume)
+            with metrics.timed("parser_page_count"):
+                self.details["no_of_pages"] = utils.get_number_of_pages(self.resume)
         except Exception:
             self.details["no_of_pages"] = None
 
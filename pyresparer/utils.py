@@ -2,20 +2,61 @@
 import os
 import re
 import io
+import sys
+import time
+import zipfile
+import multiprocessing
+import xml.etree.ElementTree as ET
 
 # Prefer pdfminer.six; fall back to pdfminer3 if that's what you installed
 try:
-    from pdfminer.high_level import extract_text as pdf_extract_text
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
     from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
 except Exception:  # pragma: no cover
-    from pdfminer3.high_level import extract_text as pdf_extract_text
+    from pdfminer3.converter import TextConverter
+    from pdfminer3.layout import LAParams
+    from pdfminer3.pdfdocument import PDFDocument
+    from pdfminer3.pdfinterp import PDFResourceManager, PDFPageInterpreter
     from pdfminer3.pdfpage import PDFPage
+    from pdfminer3.pdfparser import PDFParser
+    from pdfminer3.pdftypes import resolve1
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
 
-# Optional docx support
 try:
-    import docx2txt
-except Exception:
-    docx2txt = None
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Per-document extraction budgets. Resumes rarely need more than the first
+# few pages; the time/memory limits stop pathological PDFs from pinning a worker.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "60000"))
+PDF_TIMEOUT = float(os.getenv("PDF_TIMEOUT", "20"))
+PDF_MAX_MEMORY_MB = int(os.getenv("PDF_MAX_MEMORY_MB", "512"))
+
+# extract_pdf_text() runs pdfminer in a short-lived child process whose
+# address space is capped with RLIMIT_AS and which is killed at PDF_TIMEOUT.
+# That makes both budgets hard and per-document: a decompression bomb fails
+# inside its own stream decode, and other requests' allocations in this
+# worker don't count against it. It is on by default only on Linux: the child
+# is a plain fork (see _context()), which macOS doesn't support for threaded
+# processes, and the RLIMIT_AS baseline comes from /proc. PDF_ISOLATE=0 (or a
+# platform without `resource`) falls back to the in-process, cooperative
+# checks below.
+PDF_ISOLATE = ((os.getenv("PDF_ISOLATE") or ("1" if sys.platform.startswith("linux") else "0")) == "1"
+               and resource is not None)
+
+
+class ExtractionLimitExceeded(RuntimeError):
+    """
+    Raised when a document blows its wall-clock or memory budget.
+    """
 
 
 # --------------------
@@ -35,6 +76,223 @@ def _detect_ext(path_or_file, ext_hint=None):
     return ""
 
 
+def _docx_parts(names):
+    # Same reading order as docx2txt: headers, body, footers
+    headers = sorted(n for n in names if re.match(r"word/header\d*\.xml$", n))
+    footers = sorted(n for n in names if re.match(r"word/footer\d*\.xml$", n))
+    body = ["word/document.xml"] if "word/document.xml" in names else []
+    return headers + body + footers
+
+
+def extract_text_from_docx(file_path_or_bytes):
+    """
+    Extract text from a .docx (path or BytesIO) without writing temp files.
+    Each XML part is read straight from the zip and parsed incrementally.
+    """
+    out = []
+    with zipfile.ZipFile(file_path_or_bytes) as zf:
+        for part in _docx_parts(zf.namelist()):
+            with zf.open(part) as fh:
+                for _, el in ET.iterparse(fh, events=("end",)):
+                    tag = el.tag
+                    if tag == _W_NS + "t":
+                        out.append(el.text or "")
+                    elif tag == _W_NS + "tab":
+                        out.append("\t")
+                    elif tag in (_W_NS + "br", _W_NS + "cr"):
+                        out.append("\n")
+                    elif tag == _W_NS + "p":
+                        out.append("\n")
+                        el.clear()
+    return "".join(out)
+
+
+# --------------------
+# PDF streaming
+# --------------------
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak, not current, RSS (KB on Linux); good enough as a growth guard
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+class _Guard:
+    """
+    Cooperative budget checks for in-process extraction. The memory limit
+    is advisory: it compares the RSS of the *whole process* against its
+    value at start, so concurrent requests in a threaded worker count
+    against it, and it is only checked between pages and every
+    CHECK_EVERY glyphs, not inside a single stream decode.
+    """
+
+    def __init__(self, timeout, max_memory_mb):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.rss_limit = _rss_bytes() + max_memory_mb * 1024 * 1024 if max_memory_mb else None
+
+    def check(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ExtractionLimitExceeded("PDF extraction exceeded its time budget")
+        if self.rss_limit is not None and _rss_bytes() > self.rss_limit:
+            raise ExtractionLimitExceeded("PDF extraction exceeded its memory budget")
+
+
+class _GuardedTextConverter(TextConverter):
+    # Re-check the budget every few hundred glyphs so a single huge page
+    # cannot run unbounded between the per-page checks.
+    CHECK_EVERY = 512
+
+    def __init__(self, *args, guard=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._guard = guard
+        self._chars = 0
+
+    def render_char(self, *args, **kwargs):
+        self._chars += 1
+        if self._guard is not None and self._chars % self.CHECK_EVERY == 0:
+            self._guard.check()
+        return super().render_char(*args, **kwargs)
+
+
+def iter_pdf_pages(file_path_or_bytes, max_pages=None, max_chars=None, timeout=None,
+                   max_memory_mb=None, laparams=None):
+    """
+    Yield the text of each PDF page in order, stopping early once
+    `max_pages` pages or `max_chars` characters have been produced.
+    Raises ExtractionLimitExceeded if the document runs past `timeout`
+    seconds or grows RSS by more than `max_memory_mb` (see _Guard for why
+    the latter is only advisory in-process).
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    guard = _Guard(
+        PDF_TIMEOUT if timeout is None else timeout,
+        PDF_MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb,
+    )
+
+    if isinstance(file_path_or_bytes, (str, os.PathLike)):
+        fh = open(file_path_or_bytes, "rb")
+    else:
+        fh = file_path_or_bytes
+        fh.seek(0)
+
+    out = io.StringIO()
+    rsrcmgr = PDFResourceManager()
+    converter = _GuardedTextConverter(rsrcmgr, out, laparams=laparams or LAParams(), guard=guard)
+    interpreter = PDFPageInterpreter(rsrcmgr, converter)
+    produced = 0
+    try:
+        for page in PDFPage.get_pages(fh, maxpages=max_pages or 0, caching=True, check_extractable=True):
+            guard.check()
+            interpreter.process_page(page)
+            text = out.getvalue()
+            out.seek(0)
+            out.truncate(0)
+            if max_chars and produced + len(text) >= max_chars:
+                yield text[:max_chars - produced]
+                return
+            produced += len(text)
+            yield text
+    finally:
+        converter.close()
+        if fh is not file_path_or_bytes:
+            fh.close()
+
+
+def _address_space_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _isolated_worker(conn, data, limits, max_memory_mb):
+    try:
+        try:
+            baseline = _address_space_bytes() if max_memory_mb else None
+        except (OSError, ValueError):
+            # No /proc: a cap without the inherited address space as its
+            # baseline could fail every document, so rely on the timeout
+            baseline = None
+        if baseline is not None:
+            cap = baseline + max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (cap, resource.getrlimit(resource.RLIMIT_AS)[1]))
+        text = "".join(iter_pdf_pages(io.BytesIO(data), max_memory_mb=0, **limits))
+        conn.send(("ok", text))
+    except MemoryError:
+        conn.send(("limit", "PDF extraction exceeded its memory budget"))
+    except ExtractionLimitExceeded as exc:
+        conn.send(("limit", str(exc)))
+    except Exception as exc:
+        try:
+            conn.send(("error", exc))
+        except Exception:  # unpicklable exception
+            conn.send(("error", RuntimeError(repr(exc))))
+    finally:
+        conn.close()
+
+
+def _context():
+    # Plain fork (a few ms, pages shared copy-on-write). spawn/forkserver
+    # re-import the __main__ module in every child, which under
+    # `python app.py` means loading the models again per resume. The child
+    # only runs pdfminer and exits, and the kill timeout covers the rare
+    # lock inherited from another thread mid-fork.
+    return multiprocessing.get_context("fork")
+
+
+def _extract_isolated(file_path_or_bytes, timeout=None, max_memory_mb=None, **limits):
+    timeout = PDF_TIMEOUT if timeout is None else timeout
+    max_memory_mb = PDF_MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb
+
+    if isinstance(file_path_or_bytes, (str, os.PathLike)):
+        with open(file_path_or_bytes, "rb") as f:
+            data = f.read()
+    else:
+        file_path_or_bytes.seek(0)
+        data = file_path_or_bytes.read()
+
+    ctx = _context()
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_isolated_worker, args=(child, data, limits, max_memory_mb), daemon=True)
+    proc.start()
+    child.close()
+    try:
+        if not parent.poll(timeout or None):
+            raise ExtractionLimitExceeded("PDF extraction exceeded its time budget")
+        try:
+            status, value = parent.recv()
+        except EOFError:
+            # Killed before it could report, e.g. by the OOM killer
+            raise ExtractionLimitExceeded("PDF extraction process died") from None
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        parent.close()
+
+    if status == "ok":
+        return value
+    if status == "limit":
+        raise ExtractionLimitExceeded(value)
+    raise value
+
+
+def extract_pdf_text(file_path_or_bytes, **limits):
+    """
+    Text of the first pages of a PDF under the PDF_* budgets, extracted in
+    an isolated child process when PDF_ISOLATE is on.
+    """
+    if PDF_ISOLATE:
+        return _extract_isolated(file_path_or_bytes, **limits)
+    return "".join(iter_pdf_pages(file_path_or_bytes, **limits))
+
+
 def extract_text(file_path_or_bytes, ext=None):
     """
     Extract plain text from a file path or BytesIO.
@@ -44,26 +302,14 @@ def extract_text(file_path_or_bytes, ext=None):
 
     # PDF
     if e in (".pdf", "pdf"):
-        return pdf_extract_text(file_path_or_bytes)
+        return extract_pdf_text(file_path_or_bytes)
 
     # DOCX
     if e in (".docx", "docx"):
-        if docx2txt is None:
-            return ""  # docx2txt not installed
-        if isinstance(file_path_or_bytes, io.BytesIO):
-            # docx2txt expects a path; write temp if BytesIO
-            tmp = "_tmp_resume.docx"
-            with open(tmp, "wb") as f:
-                f.write(file_path_or_bytes.getbuffer())
-            try:
-                return docx2txt.process(tmp) or ""
-            finally:
-                try:
-                    os.remove(tmp)
-                except Exception:
-                    pass
-        else:
-            return docx2txt.process(file_path_or_bytes) or ""
+        try:
+            return extract_text_from_docx(file_path_or_bytes)
+        except (zipfile.BadZipFile, KeyError, ET.ParseError):
+            return ""
 
     # TXT
     if e in (".txt", "txt"):
@@ -74,7 +320,9 @@ def extract_text(file_path_or_bytes, ext=None):
 
     # Fallback: try PDFMiner anyway (some libs pass no ext)
     try:
-        return pdf_extract_text(file_path_or_bytes)
+        return extract_pdf_text(file_path_or_bytes)
+    except ExtractionLimitExceeded:
+        raise
     except Exception:
         return ""
 
@@ -87,16 +335,21 @@ def get_number_of_pages(file_path_or_bytes):
     if e != ".pdf":
         return 1
 
-    # Count PDF pages using PDFPage
+    # Read /Count from the page tree root instead of walking every page
     if isinstance(file_path_or_bytes, io.BytesIO):
         fh = file_path_or_bytes
+        fh.seek(0)
         close_after = False
     else:
         fh = open(file_path_or_bytes, "rb")
         close_after = True
 
     try:
-        count = sum(1 for _ in PDFPage.get_pages(fh, caching=True, check_extractable=True))
+        doc = PDFDocument(PDFParser(fh))
+        try:
+            count = int(resolve1(resolve1(doc.catalog["Pages"])["Count"]))
+        except (KeyError, TypeError, ValueError):
+            count = sum(1 for _ in PDFPage.create_pages(doc))
         return count or 1
     except Exception:
         return 1
@@ -0,0 +1,109 @@
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import artifact_store
+from db import connect
+from pyresparer import utils
+from pyresparer.resume_parser import load_tokenizer
+from resume_processing import detect_candidate_level, recommend_field_and_skills, score_resume
+
+# Re-applies skill extraction, degree keywords, scoring and recommendations
+# to every resume stored by artifact_store, then bulk-updates user_data.
+# No PDF extraction and no transformer inference: only the stored Docs and
+# text are read, so a changed skills list or score weight can be rolled out
+# in minutes.
+#
+#   python rescore.py --jobs 8 [--skills-file skills.txt] [--dry-run]
+
+UPDATE_SQL = (
+    "UPDATE user_data SET resume_score=%s, Predicted_Field=%s, User_level=%s, "
+    "Actual_skills=%s, Recommended_skills=%s, Recommended_courses=%s WHERE sec_token=%s"
+)
+
+
+def rescore(key, skills_file=None):
+    """
+    UPDATE parameters for one stored resume, or None if it can't be loaded.
+    """
+    try:
+        doc, meta = artifact_store.load(key, load_tokenizer().vocab)
+    except (OSError, ValueError, StopIteration):
+        return None
+
+    noun_chunks = list(doc.noun_chunks) if doc.has_annotation("DEP") else []
+    extracted = {
+        "name": meta.get("name"),
+        "email": meta.get("email"),
+        "mobile_number": meta.get("mobile_number"),
+        "no_of_pages": meta.get("no_of_pages"),
+        "skills": utils.extract_skills(doc, noun_chunks, skills_file),
+        "degree": utils.extract_entities_wih_custom_model(doc).get("Degree"),
+    }
+    resume_text = meta.get("resume_text", doc.text)
+
+    cand_level, _ = detect_candidate_level(extracted, resume_text)
+    reco = recommend_field_and_skills(extracted)
+    score, _, _ = score_resume(resume_text)
+
+    return (
+        str(score),
+        reco.get("field"),
+        cand_level,
+        str(extracted.get("skills")),
+        str(reco.get("skills", [])),
+        str(reco.get("courses")),
+        key,
+    )
+
+
+def _rescore_chunk(args):
+    keys, skills_file = args
+    return [row for row in (rescore(k, skills_file) for k in keys) if row is not None]
+
+
+def _chunks(keys, size):
+    chunk = []
+    for key in keys:
+        chunk.append(key)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rescore stored resumes without re-parsing them.")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="resumes per task and per UPDATE batch")
+    parser.add_argument("--skills-file", help="newline-separated skills list to use instead of the default")
+    parser.add_argument("--dry-run", action="store_true", help="compute but don't write to the database")
+    args = parser.parse_args(argv)
+
+    if not artifact_store.enabled():
+        sys.exit("ARTIFACT_DIR is empty; nothing to rescore")
+
+    tasks = ((chunk, args.skills_file) for chunk in _chunks(artifact_store.iter_keys(), args.chunk_size))
+
+    conn = None if args.dry_run else connect()
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for rows in pool.map(_rescore_chunk, tasks):
+                if not rows:
+                    continue
+                if conn is not None:
+                    cur = conn.cursor()
+                    cur.executemany(UPDATE_SQL, rows)
+                    conn.commit()
+                done += len(rows)
+                print(f"rescored {done}", file=sys.stderr)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    print(f"rescored {done} resumes{' (dry run)' if args.dry_run else ''}")
+
+
+if __name__ == "__main__":
+    main()
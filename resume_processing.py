@@ -1,10 +1,8 @@
-import io
+import os
 import base64
-from pdfminer3.layout import LAParams
-from pdfminer3.pdfpage import PDFPage
-from pdfminer3.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer3.converter import TextConverter
+from markupsafe import escape
 from pyresparer.resume_parser import ResumeParser
+from pyresparer import utils
 
 
 try:
@@ -19,8 +17,19 @@ except Exception:
     ds_course = web_course = android_course = ios_course = uiux_course = []
 
 
-def analyze_resume(file_path):
-  data = ResumeParser(file_path).get_extracted_data()
+def parse_resume(file_path):
+  """
+  Like analyze_resume, but also returns the parser's spaCy Doc so it can be
+  persisted for rescoring. Returns (None, None) on failure, including a
+  resume with no extractable text (a scanned PDF, an empty or corrupt DOCX).
+  """
+  try:
+    parser = ResumeParser(file_path)
+  except utils.ExtractionLimitExceeded:
+    return None, None
+  if not parser.text:
+    return None, None
+  data = parser.get_extracted_data()
   return {
   "name": data.get("name"),
   "email": data.get("email"),
@@ -28,29 +37,54 @@ def analyze_resume(file_path):
   "skills": data.get("skills", []),
   "degree": data.get("degree"),
   "no_of_pages": data.get("no_of_pages"),
-  }
+  }, parser.doc
+
+
+def analyze_resume(file_path):
+  return parse_resume(file_path)[0]
+
+
+def pdf_reader(file_path) -> str:
+    """
+    Layout-aware PDF text; accepts a path or a binary file object.
+    Streams pages under the PDF_MAX_* budgets and may raise
+    utils.ExtractionLimitExceeded.
+    """
+    return utils.extract_pdf_text(file_path)
 
 
-def pdf_reader(file_path: str) -> str:
-    resource_manager = PDFResourceManager()
-    fake_file_handle = io.StringIO()
-    converter = TextConverter(resource_manager, fake_file_handle, laparams=LAParams())
-    page_interpreter = PDFPageInterpreter(resource_manager, converter)
-    with open(file_path, 'rb') as fh:
-        for page in PDFPage.get_pages(fh, caching=True, check_extractable=True):
-            page_interpreter.process_page(page)
-    text = fake_file_handle.getvalue()
-    converter.close()
-    fake_file_handle.close()
-    return text
+def resume_ext(filename: str) -> str:
+    return os.path.splitext(filename or '')[1].lower()
+
+
+def read_resume_text(resume, ext: str) -> str:
+    """
+    Full resume text for scoring: pdf_reader for PDFs, the parser's
+    in-memory extractors for DOCX/TXT.
+    """
+    if ext == '.pdf':
+        return pdf_reader(resume)
+    if not isinstance(resume, str):
+        resume.seek(0)
+    return utils.extract_text(resume, ext) or ''
 
 
 def show_pdf_iframe(file_path: str) -> str:
     with open(file_path, 'rb') as f:
-        b64 = base64.b64encode(f.read()).decode('utf-8')
+        return pdf_iframe_from_bytes(f.read())
+
+
+def pdf_iframe_from_bytes(data: bytes) -> str:
+    b64 = base64.b64encode(data).decode('utf-8')
     return f'<iframe src="data:application/pdf;base64,{b64}" width="700" height="1000" type="application/pdf"></iframe>'
 
 
+def show_resume_preview(data: bytes, ext: str, resume_text: str) -> str:
+    if ext == '.pdf':
+        return pdf_iframe_from_bytes(data)
+    return f'<pre class="resume-preview">{escape(resume_text)}</pre>'
+
+
 def detect_candidate_level(extracted: dict, resume_text: str):
     pages = (extracted or {}).get('no_of_pages') or 0
     text = resume_text or ''